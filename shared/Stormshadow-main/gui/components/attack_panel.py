@@ -204,10 +204,11 @@ class AttackPanel:
         status_frame.pack(fill=tk.BOTH, expand=True)
 
         # Status text
+        colors = get_theme_colors()
         self.status_text = tk.Text(status_frame, height=8, width=70,
-                                   bg=get_theme_colors()['entry_bg'],
-                                   fg=get_theme_colors()['fg'],
-                                   insertbackground=get_theme_colors()['fg'])
+                                   bg=colors['entry_bg'],
+                                   fg=colors['fg'],
+                                   insertbackground=colors['fg'])
         self.status_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # Scrollbar for status text
@@ -6,12 +6,59 @@ This module provides the lab environment management interface.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+import collections
+import concurrent.futures
+import logging
+import os
+import queue
+import socket
+import subprocess
 import threading
 import time
+from typing import Any, Callable
 
-from gui.utils.themes import get_theme_colors, create_tooltip
+from gui.utils.command_utils import run_docker_command
+from gui.utils.themes import (get_theme_colors, create_tooltip,
+                              subscribe_theme, unsubscribe_theme)
 from gui.managers.gui_storm_manager import GUIStormManager
 from gui.utils.gui_lab_manager import GUILabManager
+from utils.config.config import Config, Parameters, ConfigType
+from utils.core.logs import get_logger
+
+# Static panel text
+_LAB_INFO_TEXT = """
+        The SIP Lab Environment provides a containerized Asterisk PBX server for testing SIP attacks safely.
+
+        Features:
+        • Asterisk PBX with SIP support
+        • Containerized for isolation and security
+        • Pre-configured with test extensions
+        • Network isolation with custom routing
+        • Real-time monitoring and logging
+        """.strip()
+
+_CONTAINER_DETAILS_TEXT = "Image: asterisk-sip-server | Container: sip-victim | Network: host mode"
+
+# (start, stop, restart) button states keyed by lab_running
+_BUTTON_STATES = {
+    True: (tk.DISABLED, tk.NORMAL, tk.NORMAL),
+    False: (tk.NORMAL, tk.DISABLED, tk.DISABLED),
+}
+
+# Status log batching: pending lines are flushed to the Text widget at most
+# once per interval, and the widget itself is capped to a bounded line count.
+_STATUS_FLUSH_MS = 100
+_STATUS_MAX_LINES = 2000
+
+# Container log lines fetched by "Show Logs"
+_LOGS_TAIL_LINES = 200
+
+# Lab status transitions arriving within this window collapse into one refresh
+_STATUS_DEBOUNCE_MS = 50
+
+# While a start/stop is in flight, re-check the real lab status this often in
+# case the final transition callback never arrives
+_STATUS_WATCHDOG_MS = 5000
 
 
 class LabPanel:
@@ -28,17 +75,51 @@ class LabPanel:
         self.parent = parent
         self.gui_manager = gui_manager
         self.lab_instance = None
+
+        # Pending status log messages, stamped and flushed in batches by _flush_status
+        self._pending_lines: collections.deque[str] = collections.deque(maxlen=_STATUS_MAX_LINES)
+        self._flush_scheduled = False
+
+        # Pending debounced status refresh (Tk after id)
+        self._status_debounce_id: str | None = None
+        self._last_status = "Stopped"
+        self._status_watchdog_id: str | None = None
+
+        # Last lab_running value applied to the control buttons
+        self._last_button_state: bool | None = None
+
+        # UI updates posted from worker threads; only the Tk thread touches widgets.
+        # Posting also writes a byte to a socket pair watched by the Tk event
+        # loop, so the queue is drained as soon as something is posted
+        self._ui_q: queue.SimpleQueue[Callable[[], Any]] = queue.SimpleQueue()
+        self._ui_wake_r, self._ui_wake_w = socket.socketpair()
+        self._ui_wake_r.setblocking(False)
+        self._ui_wake_w.setblocking(False)
+
+        # Lab container process whose stdout is currently watched by Tk, and
+        # the descriptor the handler was registered for
+        self._output_proc: "subprocess.Popen[bytes] | None" = None
+        self._output_fd: int | None = None
+
+        # Thread streaming container logs for "Show Logs", while it runs
+        self._logs_thread: threading.Thread | None = None
+
+        # Lab operations run one at a time on a single shared worker; each
+        # future completes only once its operation has finished
+        self._lab_exec = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                               thread_name_prefix='lab')
+        self._lab_future: "concurrent.futures.Future[bool] | None" = None
         
         # Create a dedicated GUI lab manager for direct lab operations
-        from utils.config.config import Config, Parameters, ConfigType
         lab_params = Parameters({})  # Empty params, will be filled by GUI controls
         lab_config = Config(ConfigType.LAB, lab_params)
         self.gui_lab_manager = GUILabManager(lab_config)
-        self.gui_lab_manager.set_status_callback(self._on_lab_status_update)
+        self.gui_lab_manager.set_status_callback(
+            lambda status, message: self._post_ui(self._on_lab_status_update, status, message))
 
-        # Create the main frame
+        # Create the main frame; it is packed into the parent only once the
+        # whole widget tree exists so geometry is solved in a single pass
         self.main_frame = ttk.Frame(parent)
-        self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # Create components
         self._create_lab_info()
@@ -47,10 +128,79 @@ class LabPanel:
         self._create_status_display()
 
         # Register for status updates from storm manager
-        self.gui_manager.register_status_callback("lab_panel", self._on_status_update)
-        
-        # Start status update timer
-        self._update_status_timer()
+        self.gui_manager.register_status_callback(
+            "lab_panel",
+            lambda instance_name, status: self._post_ui(self._on_status_update,
+                                                        instance_name, status))
+
+        self.parent.tk.createfilehandler(self._ui_wake_r, tk.READABLE, self._pump_ui)
+
+        self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    def _post_ui(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Queue a UI update to run on the Tk thread (safe from any thread)."""
+        self._ui_q.put(lambda: fn(*args))
+        try:
+            self._ui_wake_w.send(b'\0')
+        except BlockingIOError:
+            pass  # Socket buffer full: a wakeup is already pending
+        except OSError:
+            pass  # Panel cleaned up
+
+    def _pump_ui(self, _fd: Any = None, _mask: int = 0):
+        """Run all UI updates posted by worker threads."""
+        # Clear the wakeup before draining so a post racing with us re-arms it
+        try:
+            self._ui_wake_r.recv(4096)
+        except BlockingIOError:
+            pass
+
+        while True:
+            try:
+                fn = self._ui_q.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn()
+            except Exception as e:
+                self._add_status_message(f"UI update error: {e}")
+
+    def _attach_lab_output(self):
+        """Watch the lab container's stdout from the Tk event loop."""
+        lab_manager = self.gui_lab_manager.lab_manager
+        if lab_manager is None or lab_manager.container_process is self._output_proc:
+            return
+        fd = lab_manager.stdout_fd
+        if fd is None:
+            return
+
+        self._detach_lab_output()
+        # Keep the process (and so its pipe) alive while the handler is registered
+        self._output_proc = lab_manager.container_process
+        self._output_fd = fd
+        self.parent.tk.createfilehandler(fd, tk.READABLE, self._drain_lab_output)
+
+    def _drain_lab_output(self, fd: int, _mask: int):
+        """Copy available container output into the status log."""
+        # Tk only calls this when fd is readable, so the read never blocks
+        data = os.read(fd, 65536)
+        if not data:
+            self._detach_lab_output()
+            return
+
+        for line in data.decode(errors='replace').splitlines():
+            if line.strip():
+                self._add_status_message(f"Container: {line}")
+
+    def _detach_lab_output(self):
+        """Stop watching the lab container's stdout."""
+        if self._output_fd is None:
+            return
+        # Tk keys handlers by descriptor number, so this works even once the
+        # process's stdout has been closed
+        self.parent.tk.deletefilehandler(self._output_fd)
+        self._output_fd = None
+        self._output_proc = None
 
     def _create_lab_info(self):
         """Create the lab information section."""
@@ -60,18 +210,7 @@ class LabPanel:
         info_frame.pack(fill=tk.X, pady=(0, 10))
 
         # Information text
-        info_text = """
-        The SIP Lab Environment provides a containerized Asterisk PBX server for testing SIP attacks safely.
-
-        Features:
-        • Asterisk PBX with SIP support
-        • Containerized for isolation and security
-        • Pre-configured with test extensions
-        • Network isolation with custom routing
-        • Real-time monitoring and logging
-        """
-
-        info_label = ttk.Label(info_frame, text=info_text.strip(),
+        info_label = ttk.Label(info_frame, text=_LAB_INFO_TEXT,
                                wraplength=600, justify=tk.LEFT)
         info_label.pack(padx=15, pady=10)
 
@@ -145,8 +284,7 @@ class LabPanel:
             style="Heading.TLabel").pack(
             anchor=tk.W)
 
-        details_text = "Image: asterisk-sip-server | Container: sip-victim | Network: host mode"
-        ttk.Label(container_frame, text=details_text,
+        ttk.Label(container_frame, text=_CONTAINER_DETAILS_TEXT,
                   style="TLabel").pack(anchor=tk.W, pady=2)
 
     def _create_control_buttons(self):
@@ -213,11 +351,14 @@ class LabPanel:
         ttk.Label(status_frame, text="Lab Logs:", style="Heading.TLabel").pack(
             anchor=tk.W, padx=10, pady=(10, 0))
 
+        colors = get_theme_colors()
         self.status_text = tk.Text(status_frame, height=8, width=70,
-                                   bg=get_theme_colors()['entry_bg'],
-                                   fg=get_theme_colors()['fg'],
-                                   insertbackground=get_theme_colors()['fg'])
+                                   bg=colors['entry_bg'],
+                                   fg=colors['fg'],
+                                   insertbackground=colors['fg'],
+                                   undo=False, state=tk.DISABLED)
         self.status_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        subscribe_theme(self._apply_theme_colors)
 
         # Scrollbar for status text
         scrollbar = ttk.Scrollbar(self.status_text)
@@ -232,12 +373,29 @@ class LabPanel:
         self._add_status_message(
             "Lab environment ready to start. Configure settings and click 'Start Lab'.")
 
+    def _lab_busy(self) -> bool:
+        """Return True if a lab operation is still running on the worker."""
+        return self._lab_future is not None and not self._lab_future.done()
+
+    def _submit_lab_op(self, op: Callable[[], bool],
+                       on_done: Callable[["concurrent.futures.Future[bool]"], None]) -> None:
+        """Run a lab operation on the shared worker and report back via on_done."""
+        self._lab_future = self._lab_exec.submit(op)
+        self._lab_future.add_done_callback(on_done)
+
+    def _apply_theme_colors(self):
+        """Recolor the status log in place after a theme change."""
+        colors = get_theme_colors()
+        self.status_text.configure(bg=colors['entry_bg'], fg=colors['fg'],
+                                   insertbackground=colors['fg'])
+
     def _start_lab(self):
         """Start the lab environment."""
+        if self._lab_busy():
+            return
         self._add_status_message("Starting lab environment...")
 
         # Update the GUI lab manager's config with current settings
-        from utils.config.config import Config, Parameters, ConfigType
         lab_params = Parameters({
             "spoofed_subnet": self.spoofed_subnet_var.get(),
             "return_addr": self.return_addr_var.get(),
@@ -251,70 +409,96 @@ class LabPanel:
         lab_config = Config(ConfigType.LAB, lab_params)
         self.gui_lab_manager.config = lab_config
 
-        self._add_status_message(f"Configuration: {dict(lab_params)}")
+        # Only render the full configuration when debugging
+        if get_logger().isEnabledFor(logging.DEBUG):
+            self._add_status_message(f"Configuration: {lab_params!r}")
+        else:
+            self._add_status_message("Configuration loaded")
 
-        # Start lab using GUI lab manager
-        def start_thread():
-            success = self.gui_lab_manager.start_lab()
-            if success:
-                self._update_button_states(lab_running=True)
-                self._add_status_message("Lab start initiated...")
-            else:
-                self._add_status_message("Failed to start lab!")
-                messagebox.showerror(
-                    "Error", "Failed to start the lab. Check Docker installation and permissions.")
+        # Start lab using GUI lab manager on the worker to avoid blocking GUI
+        self._submit_lab_op(self.gui_lab_manager.start_lab, self._on_start_done)
 
-        # Run in separate thread to avoid blocking GUI
-        thread = threading.Thread(target=start_thread, daemon=True)
-        thread.start()
+    def _on_start_done(self, future: "concurrent.futures.Future[bool]"):
+        """Report the outcome of a lab start."""
+        if future.exception() is None and future.result():
+            self._post_ui(self._update_button_states, True)
+            self._post_ui(self._add_status_message, "Lab started successfully!")
+        else:
+            self._post_ui(self._add_status_message, "Failed to start lab!")
+            self._post_ui(
+                messagebox.showerror,
+                "Error", "Failed to start the lab. Check Docker installation and permissions.")
 
     def _stop_lab(self):
         """Stop the lab environment."""
+        if self._lab_busy():
+            return
         self._add_status_message("Stopping lab environment...")
 
-        def stop_thread():
-            success = self.gui_lab_manager.stop_lab()
-            if success:
-                self._update_button_states(lab_running=False)
-                self._update_status_display("Stopped")
-                self._add_status_message("Lab stopped successfully!")
-            else:
-                self._add_status_message("Failed to stop lab!")
-                messagebox.showerror("Error", "Failed to stop the lab.")
+        # Stop lab on the worker to avoid blocking GUI
+        self._submit_lab_op(self.gui_lab_manager.stop_lab, self._on_stop_done)
 
-        # Run in separate thread to avoid blocking GUI
-        thread = threading.Thread(target=stop_thread, daemon=True)
-        thread.start()
+    def _on_stop_done(self, future: "concurrent.futures.Future[bool]"):
+        """Report the outcome of a lab stop."""
+        if future.exception() is None and future.result():
+            self._post_ui(self._update_button_states, False)
+            self._post_ui(self._update_status_display, "Stopped")
+            self._post_ui(self._add_status_message, "Lab stopped successfully!")
+        else:
+            self._post_ui(self._add_status_message, "Failed to stop lab!")
+            self._post_ui(messagebox.showerror, "Error", "Failed to stop the lab.")
 
     def _restart_lab(self):
         """Restart the lab environment."""
+        if self._lab_busy():
+            return
         self._add_status_message("Restarting lab environment...")
-        
-        def restart_thread():
-            # Stop first
-            success = self.gui_lab_manager.stop_lab()
-            if success:
-                time.sleep(2)  # Wait a moment
-                # Start again
-                success = self.gui_lab_manager.start_lab()
-                if success:
-                    self._add_status_message("Lab restart initiated...")
-                else:
-                    self._add_status_message("Failed to restart lab!")
-                    messagebox.showerror("Error", "Failed to restart the lab.")
-            else:
-                self._add_status_message("Failed to stop lab for restart!")
-
-        # Run in separate thread to avoid blocking GUI
-        thread = threading.Thread(target=restart_thread, daemon=True)
-        thread.start()
+
+        # restart_lab() stops and then starts the lab in the worker thread
+        self._submit_lab_op(self.gui_lab_manager.restart_lab, self._on_restart_done)
+
+    def _on_restart_done(self, future: "concurrent.futures.Future[bool]"):
+        """Report the outcome of a restart."""
+        if future.exception() is None and future.result():
+            self._post_ui(self._update_button_states, True)
+            self._post_ui(self._add_status_message, "Lab restarted successfully!")
+        else:
+            self._post_ui(self._update_button_states, self.gui_lab_manager.is_running())
+            self._post_ui(self._add_status_message, "Failed to restart lab!")
+            self._post_ui(messagebox.showerror, "Error", "Failed to restart the lab.")
 
     def _show_logs(self):
-        """Show detailed container logs."""
-        # This is a placeholder - in a real implementation, you'd fetch actual container logs
-        messagebox.showinfo("Container Logs",
-                            "Container log viewing will be implemented in a future version.\n"
-                            "For now, check the Status tab for basic log information.")
+        """Stream the lab container's recent logs into the status log."""
+        lab_manager = self.gui_lab_manager.lab_manager
+        if lab_manager is None:
+            self._add_status_message("Lab is not running: no container logs to show.")
+            return
+        if self._logs_thread is not None and self._logs_thread.is_alive():
+            return
+
+        self._add_status_message(f"Container logs (last {_LOGS_TAIL_LINES} lines):")
+        # Off the Tk thread, like lab operations, but not queued behind them
+        self._logs_thread = threading.Thread(target=self._stream_logs,
+                                             args=(lab_manager.container_name,),
+                                             daemon=True, name='lab-logs')
+        self._logs_thread.start()
+
+    def _stream_logs(self, container_name: str):
+        """Post each line of `docker logs` to the status log; runs on a worker thread."""
+        def on_line(line: str):
+            if line.strip():
+                self._post_ui(self._add_status_message, f"Container: {line.rstrip()}")
+
+        try:
+            result = run_docker_command(['logs', '--tail', str(_LOGS_TAIL_LINES), container_name],
+                                        operation_name="container logs", check=False,
+                                        stream_callback=on_line)
+        except Exception as e:
+            self._post_ui(self._add_status_message, f"Failed to read container logs: {e}")
+            return
+        if result.returncode != 0:
+            self._post_ui(self._add_status_message,
+                          f"docker logs exited with code {result.returncode}")
 
     def _open_shell(self):
         """Open a shell to the container."""
@@ -325,14 +509,14 @@ class LabPanel:
 
     def _update_button_states(self, lab_running: bool):
         """Update button states based on lab status."""
-        if lab_running:
-            self.start_button.config(state=tk.DISABLED)
-            self.stop_button.config(state=tk.NORMAL)
-            self.restart_button.config(state=tk.NORMAL)
-        else:
-            self.start_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
-            self.restart_button.config(state=tk.DISABLED)
+        if self._last_button_state == lab_running:
+            return
+
+        start_s, stop_s, restart_s = _BUTTON_STATES[lab_running]
+        self.start_button.config(state=start_s)
+        self.stop_button.config(state=stop_s)
+        self.restart_button.config(state=restart_s)
+        self._last_button_state = lab_running
 
     def _update_status_display(self, status: str):
         """Update the status display."""
@@ -350,19 +534,53 @@ class LabPanel:
 
     def _add_status_message(self, message: str):
         """Add a status message to the display."""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}\n"
-
-        self.status_text.insert(tk.END, formatted_message)
+        self._pending_lines.append(message)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.parent.after(_STATUS_FLUSH_MS, self._flush_status)
+
+    def _flush_status(self):
+        """Write all pending status lines to the display in a single insert."""
+        self._flush_scheduled = False
+        if not self._pending_lines:
+            return
+
+        # One timestamp per batch; batches are at most _STATUS_FLUSH_MS apart
+        timestamp = time.strftime("%H:%M:%S")
+        buf = "".join([f"[{timestamp}] {message}\n" for message in self._pending_lines])
+        self._pending_lines.clear()
+
+        # The log is read-only; only unlock it for the append
+        self.status_text.configure(state=tk.NORMAL)
+        self.status_text.insert(tk.END, buf)
+
+        # Drop the oldest lines to keep redraw cost bounded
+        line_count = int(self.status_text.index("end-1c").split(".")[0])
+        if line_count > _STATUS_MAX_LINES:
+            self.status_text.delete("1.0", f"end-{_STATUS_MAX_LINES}l")
+
+        self.status_text.configure(state=tk.DISABLED)
         self.status_text.see(tk.END)
 
-    def _on_lab_status_update(self, message: str):
+    def _on_lab_status_update(self, status: str, message: str):
         """Handle status updates from the GUI lab manager."""
         self._add_status_message(f"Lab: {message}")
-        
+        self._last_status = status
+        if status == "Running":
+            self._attach_lab_output()
+
+        # Coalesce bursts of updates into a single display refresh
+        if self._status_debounce_id is not None:
+            self.parent.after_cancel(self._status_debounce_id)
+        self._status_debounce_id = self.parent.after(_STATUS_DEBOUNCE_MS,
+                                                     self._apply_status_update)
+
+    def _apply_status_update(self):
+        """Refresh the status display from the latest lab manager state."""
+        self._status_debounce_id = None
+        status = self._last_status
+
         # Update display based on status
-        status = self.gui_lab_manager.get_status()
         if status == "Running":
             self._update_status_display("Running")
             self._update_button_states(lab_running=True)
@@ -376,28 +594,34 @@ class LabPanel:
         else:
             self._update_status_display(status)
 
-    def _update_status_timer(self):
-        """Periodically update the lab status."""
+        self._schedule_status_watchdog(status.startswith(("Starting", "Stopping")))
+
+    def _schedule_status_watchdog(self, in_flight: bool):
+        """Arm the status watchdog while a transition is in flight, cancel it otherwise."""
+        if not in_flight:
+            if self._status_watchdog_id is not None:
+                self.parent.after_cancel(self._status_watchdog_id)
+                self._status_watchdog_id = None
+            return
+
+        if self._status_watchdog_id is None:
+            self._status_watchdog_id = self.parent.after(_STATUS_WATCHDOG_MS,
+                                                         self._status_watchdog)
+
+    def _status_watchdog(self):
+        """Re-check the lab status while a start/stop is still in flight."""
+        self._status_watchdog_id = None
         try:
-            # Check actual lab status
             status = self.gui_lab_manager.get_status()
-            current_display = self.status_label.cget("text")
-            
-            # Update if status changed
-            if current_display != status:
-                self._update_status_display(status)
-                
-                # Update button states based on status
-                if status == "Running":
-                    self._update_button_states(lab_running=True)
-                elif status == "Stopped":
-                    self._update_button_states(lab_running=False)
-                    
         except Exception as e:
             self._add_status_message(f"Status check error: {e}")
-            
-        # Schedule next update
-        self.parent.after(3000, self._update_status_timer)  # Update every 3 seconds
+            return
+
+        if status != self._last_status:
+            self._last_status = status
+            self._apply_status_update()
+        else:
+            self._schedule_status_watchdog(status.startswith(("Starting", "Stopping")))
 
     def _on_status_update(self, instance_name: str, status: str):
         """Handle status updates from the GUI manager."""
@@ -414,7 +638,16 @@ class LabPanel:
         """Clean up the lab panel resources."""
         # Unregister status callback from storm manager
         self.gui_manager.unregister_status_callback("lab_panel")
-
-        # Stop lab if running via GUI lab manager
+        unsubscribe_theme(self._apply_theme_colors)
+        self._schedule_status_watchdog(False)
+        self._detach_lab_output()
+        self.parent.tk.deletefilehandler(self._ui_wake_r)
+        self._ui_wake_r.close()
+        self._ui_wake_w.close()
+
+        # Stop lab if running via GUI lab manager; the worker finishes the
+        # stop (after any operation still in flight) before the process exits
         if hasattr(self, 'gui_lab_manager') and self.gui_lab_manager.is_running():
-            self.gui_lab_manager.stop_lab()
+            self._lab_exec.submit(self.gui_lab_manager.stop_lab)
+
+        self._lab_exec.shutdown(wait=False)
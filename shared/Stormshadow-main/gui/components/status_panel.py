@@ -147,10 +147,11 @@ class StatusPanel:
         log_text_frame = ttk.Frame(log_frame)
         log_text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
+        colors = get_theme_colors()
         self.log_text = tk.Text(log_text_frame, height=15,
-                                bg=get_theme_colors()['entry_bg'],
-                                fg=get_theme_colors()['fg'],
-                                insertbackground=get_theme_colors()['fg'],
+                                bg=colors['entry_bg'],
+                                fg=colors['fg'],
+                                insertbackground=colors['fg'],
                                 font=('Consolas', 10))
 
         # Create scrollbars and manually connect them
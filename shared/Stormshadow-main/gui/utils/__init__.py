@@ -4,10 +4,14 @@ GUI Utils Package
 This package contains utility functions and classes for the GUI.
 """
 
-from .themes import apply_modern_theme, get_theme_colors, create_tooltip
+from .themes import (apply_modern_theme, get_theme_colors, create_tooltip,
+                     subscribe_theme, unsubscribe_theme, notify_theme_changed)
 
 __all__ = [
     'apply_modern_theme',
     'get_theme_colors',
-    'create_tooltip'
+    'create_tooltip',
+    'subscribe_theme',
+    'unsubscribe_theme',
+    'notify_theme_changed'
 ]
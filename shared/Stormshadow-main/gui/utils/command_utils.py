@@ -5,9 +5,30 @@ This module provides a simple interface for GUI components to run commands
 with proper sudo handling using the custom command runner.
 """
 
+import functools
+import logging
+import os
+import shutil
 import subprocess
-from typing import List, Dict, Optional, Any
-from utils.core.logs import print_info, print_error, print_warning
+import time
+from typing import Callable, List, Dict, Optional, Any
+from utils.core.logs import get_logger, print_info, print_error, print_warning
+
+# Probe the custom command runner once; run_gui_command falls back to plain
+# subprocess when it is unavailable
+try:
+    from utils.core.command_runner import run_command as _run_command, _prefix_sudo_argv
+    _runner_import_error: Optional[ImportError] = None
+except ImportError as _e:
+    _run_command = None
+    _prefix_sudo_argv = None
+    _runner_import_error = _e
+
+# How long a successful test_sudo_access() is reused; sudo credentials are
+# cached for several minutes by default, so this stays well within that window.
+# Failures are never reused, so newly granted access is seen at once
+_SUDO_CACHE_TTL = 60.0
+_sudo_cache: Dict[str, float] = {'ok_ts': 0.0}
 
 
 def run_gui_command(
@@ -19,7 +40,8 @@ def run_gui_command(
     text: bool = True,
     check: bool = True,
     cwd: Optional[str] = None,
-    env: Optional[Dict[str, str]] = None
+    env: Optional[Dict[str, str]] = None,
+    stream_callback: Optional[Callable[[str], None]] = None
 ) -> subprocess.CompletedProcess[str]:
     """
     Run a command from GUI with proper sudo handling and environment preservation.
@@ -38,36 +60,21 @@ def run_gui_command(
         check: Whether to raise exception on non-zero exit
         cwd: Working directory for command
         env: Environment variables override
+        stream_callback: If given, stdout and stderr are merged and passed to
+            this callback line by line instead of being captured in memory;
+            capture_output and text are ignored
 
     Returns:
-        subprocess.CompletedProcess[str]: Result of the command
+        subprocess.CompletedProcess[str]: Result of the command (stdout/stderr
+        are None when streaming)
 
     Raises:
         subprocess.CalledProcessError: If check=True and command fails
         PermissionError: If sudo is needed but user declines
     """
-    try:
-        from utils.core.command_runner import run_command
-
-        print_info(f"GUI running {operation_name}: {' '.join(command)}")
-
-        # Use custom command runner with environment preservation
-        result = run_command(
-            command,
-            cwd=cwd,
-            env=env,
-            want_sudo=need_sudo,
-            sudo_preserve_env=True,  # Always preserve environment for GUI commands
-            sudo_non_interactive=False,  # Allow password prompts for GUI
-            capture_output=capture_output,
-            check=check,
-            text=text
-        )
-
-        return result
-
-    except ImportError as e:
-        print_warning(f"Custom command runner not available, falling back to subprocess: {e}")
+    if _run_command is None or _prefix_sudo_argv is None:
+        print_warning(
+            f"Custom command runner not available, falling back to subprocess: {_runner_import_error}")
 
         # Fallback to standard subprocess with sudo if needed
         if need_sudo:
@@ -76,6 +83,10 @@ def run_gui_command(
         else:
             final_command = command
 
+        if stream_callback is not None:
+            return _stream_command(final_command, cwd=cwd, env=env, check=check,
+                                   stream_callback=stream_callback)
+
         return subprocess.run(
             final_command,
             cwd=cwd,
@@ -85,11 +96,83 @@ def run_gui_command(
             text=text
         )
 
+    try:
+        # Only build the command line string when INFO logging is enabled
+        if get_logger().isEnabledFor(logging.INFO):
+            print_info(f"GUI running {operation_name}: {' '.join(command)}")
+
+        if stream_callback is not None:
+            final_command = _prefix_sudo_argv(
+                command,
+                want_sudo=need_sudo,
+                non_interactive=False,
+                preserve_env=True
+            )
+            return _stream_command(final_command, cwd=cwd, env=env, check=check,
+                                   stream_callback=stream_callback)
+
+        # Use custom command runner with environment preservation
+        result = _run_command(
+            command,
+            cwd=cwd,
+            env=env,
+            want_sudo=need_sudo,
+            sudo_preserve_env=True,  # Always preserve environment for GUI commands
+            sudo_non_interactive=False,  # Allow password prompts for GUI
+            capture_output=capture_output,
+            check=check,
+            text=text
+        )
+
+        return result
+
     except Exception as e:
         print_error(f"Failed to run {operation_name}: {e}")
         raise
 
 
+def _stream_command(
+    command: List[str],
+    *,
+    cwd: Optional[str],
+    env: Optional[Dict[str, str]],
+    check: bool,
+    stream_callback: Callable[[str], None]
+) -> subprocess.CompletedProcess[str]:
+    """
+    Run a command and hand its merged stdout/stderr to a callback line by line.
+
+    Memory use stays constant regardless of how much the command prints.
+
+    Args:
+        command: Final command (sudo already applied) as list of strings
+        cwd: Working directory for command
+        env: Environment variables override
+        check: Whether to raise exception on non-zero exit
+        stream_callback: Called with each output line (trailing newline kept)
+
+    Returns:
+        subprocess.CompletedProcess[str]: Result without captured output
+    """
+    with subprocess.Popen(
+        command,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+        text=True
+    ) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            stream_callback(line)
+        returncode = proc.wait()
+
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    return subprocess.CompletedProcess(command, returncode)
+
+
 def run_docker_command(
     docker_args: List[str],
     *,
@@ -146,29 +229,30 @@ def check_command_available(command_name: str) -> bool:
     """
     Check if a command is available on the system.
 
+    Results are cached for the current PATH.
+
     Args:
         command_name: Name of the command to check
 
     Returns:
         bool: True if command is available, False otherwise
     """
-    try:
-        result = run_gui_command(
-            ['which', command_name],
-            operation_name=f"check {command_name}",
-            need_sudo=False,
-            check=False,  # Don't raise exception if not found
-            capture_output=True
-        )
-        return result.returncode == 0
-    except Exception:
-        return False
+    return _check_command_available(command_name, os.environ.get('PATH', ''))
+
+
+@functools.lru_cache(maxsize=64)
+def _check_command_available(command_name: str, path: str) -> bool:
+    """Cached implementation of check_command_available, keyed on PATH."""
+    # In-process PATH scan; no need to spawn `which`
+    return shutil.which(command_name, path=path) is not None
 
 
 def get_command_version(command_name: str, version_arg: str = '--version') -> Optional[str]:
     """
     Get version information for a command.
 
+    Results are cached for the current PATH.
+
     Args:
         command_name: Name of the command
         version_arg: Argument to get version (default: --version)
@@ -176,10 +260,14 @@ def get_command_version(command_name: str, version_arg: str = '--version') -> Op
     Returns:
         Optional[str]: Version string if successful, None otherwise
     """
+    return _get_command_version(command_name, version_arg, os.environ.get('PATH', ''))
+
+
+@functools.lru_cache(maxsize=64)
+def _get_command_version(command_name: str, version_arg: str, path: str) -> Optional[str]:
+    """Cached implementation of get_command_version, keyed on PATH."""
     try:
         # For version checks, use subprocess directly to avoid logging
-        import subprocess
-        
         result = subprocess.run(
             [command_name, version_arg],
             capture_output=True,
@@ -201,9 +289,16 @@ def test_sudo_access() -> bool:
     """
     Test if sudo access is available without prompting for password.
 
+    A successful check is reused for a short time; a failed one is not.
+    Call reset_sudo_cache() after anything that revokes sudo credentials.
+
     Returns:
         bool: True if sudo access is available, False otherwise
     """
+    now = time.monotonic()
+    if _sudo_cache['ok_ts'] and now - _sudo_cache['ok_ts'] < _SUDO_CACHE_TTL:
+        return True
+
     try:
         result = run_gui_command(
             ['sudo', '-n', 'true'],
@@ -212,6 +307,36 @@ def test_sudo_access() -> bool:
             check=False,
             capture_output=True
         )
+        ok = result.returncode == 0
+    except Exception:
+        ok = False
+
+    if ok:
+        _sudo_cache['ok_ts'] = now
+    return ok
+
+
+def test_sudo_docker_access() -> bool:
+    """
+    Test if docker can be run through sudo without a password prompt.
+
+    This is the case when running as root or once the lab sudoers rule
+    (see gui.utils.terminal_sudo.install_lab_sudoers_rule) is installed.
+
+    Returns:
+        bool: True if ``sudo -n docker ps`` succeeds, False otherwise
+    """
+    command = ['docker', 'ps', '-q']
+    if os.geteuid() != 0:
+        command = ['sudo', '-n'] + command
+
+    try:
+        result = subprocess.run(command, capture_output=True, check=False)
         return result.returncode == 0
     except Exception:
         return False
+
+
+def reset_sudo_cache() -> None:
+    """Forget a cached successful test_sudo_access() result."""
+    _sudo_cache['ok_ts'] = 0.0
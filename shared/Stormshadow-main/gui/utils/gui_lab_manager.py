@@ -8,23 +8,32 @@ sudo requirements in a user-friendly way for GUI operations.
 import subprocess
 import tkinter as tk
 from tkinter import messagebox
-import threading
 import time
 from typing import Optional, Callable
 
+from gui.utils.command_utils import reset_sudo_cache, test_sudo_docker_access
+from gui.utils.terminal_sudo import build_terminal_command, has_polkit, install_lab_sudoers_rule
 from utils.lab_manager import LabManager
 from utils.config.config import Config
 from utils.core.logs import print_info, print_error, print_warning, print_success
 
+# How long a container status lookup (a `docker ps` round-trip) is reused
+_STATUS_TTL = 0.5
+
 
 class GUILabManager:
     """
     GUI-friendly wrapper for lab manager operations.
 
     This class handles sudo requirements and provides user feedback
-    for lab operations in the GUI context.
+    for lab operations in the GUI context. Operations block until they
+    finish, so callers run them off the Tk thread.
     """
 
+    # Hidden Tk root used as dialog parent when no application root exists;
+    # created on first use and kept for the life of the process
+    _hidden_root: Optional[tk.Tk] = None
+
     def __init__(self, config: Config):
         """
         Initialize GUI lab manager.
@@ -34,22 +43,68 @@ class GUILabManager:
         """
         self.config = config
         self.lab_manager: Optional[LabManager] = None
-        self.status_callback: Optional[Callable[[str], None]] = None
+        self.status_callback: Optional[Callable[[str, str], None]] = None
         self._is_starting = False
         self._is_stopping = False
+        self._status_cache: Optional[tuple[float, str]] = None
+        # Whether docker runs through sudo without a password; probed by the
+        # first lab start
+        self._sudo_docker_ok: Optional[bool] = None
+
+    def set_status_callback(self, callback: Optional[Callable[[str, str], None]]) -> None:
+        """
+        Set callback function for status updates.
 
-    def set_status_callback(self, callback: Optional[Callable[[str], None]]) -> None:
-        """Set callback function for status updates."""
+        The callback receives ``(status, message)`` where ``status`` is the
+        lab status after the transition (same values as :meth:`get_status`).
+        """
         self.status_callback = callback
 
-    def _update_status(self, message: str):
-        """Update status via callback if available."""
+    def _probe_sudo_docker(self) -> None:
+        """Check once whether docker can run through sudo without a prompt."""
+        self._sudo_docker_ok = test_sudo_docker_access()
+        if self._sudo_docker_ok:
+            print_info("Docker is usable without a sudo password prompt")
+
+    def _update_status(self, message: str, status: Optional[str] = None):
+        """
+        Update status via callback if available.
+
+        Args:
+            message: Human-readable status message
+            status: Lab status after this update; defaults to :meth:`get_status`
+        """
         if self.status_callback:
             try:
-                self.status_callback(message)
+                self.status_callback(status if status is not None else self.get_status(),
+                                     message)
             except Exception as e:
                 print_error(f"Error in status callback: {e}")
 
+    def _lab_status(self, lab_manager: LabManager) -> str:
+        """Return lab_manager.status(), reusing results younger than _STATUS_TTL."""
+        now = time.monotonic()
+        if self._status_cache is not None and now - self._status_cache[0] < _STATUS_TTL:
+            return self._status_cache[1]
+
+        status = lab_manager.status()
+        self._status_cache = (now, status)
+        return status
+
+    def _invalidate_status(self) -> None:
+        """Drop the cached container status after a lab transition."""
+        self._status_cache = None
+
+    @classmethod
+    def _dialog_root(cls) -> tk.Misc:
+        """Return a Tk root to parent dialogs, creating a hidden one only once."""
+        root = getattr(tk, '_default_root', None) or cls._hidden_root
+        if root is None:
+            root = tk.Tk()
+            root.withdraw()
+            cls._hidden_root = root
+        return root
+
     def _show_sudo_error_dialog(self, operation: str, error_message: str) -> bool:
         """
         Show dialog for sudo-related errors with helpful suggestions.
@@ -61,9 +116,13 @@ class GUILabManager:
         Returns:
             bool: True if user wants to try alternative approach
         """
+        if self._sudo_docker_ok:
+            # Docker already runs without a password, so sudo is not the cause
+            print_error(f"Lab operation '{operation}' failed: {error_message}")
+            return False
+
         try:
-            root = tk.Tk()
-            root.withdraw()
+            root = self._dialog_root()
 
             message = (
                 f"Lab operation '{operation}' requires administrator privileges.\n\n"
@@ -76,22 +135,36 @@ class GUILabManager:
                 "• Close this GUI\n"
                 "• Run: sudo python main.py --gui\n"
                 "• This will start the GUI with admin privileges\n\n"
-                "Would you like to open a terminal for manual Docker commands?"
             )
 
+            if has_polkit():
+                # The rule is installed through a native polkit prompt, so
+                # there is no need to fall back to a terminal
+                message += ("Allow the lab's Docker commands without a password?\n"
+                            "(one-time system authentication prompt)")
+                result = messagebox.askyesno(
+                    "Administrator Privileges Required",
+                    message,
+                    icon='warning',
+                    parent=root
+                )
+                return result and self._install_sudoers_rule()
+
+            message += ("Yes: allow the lab's Docker commands without a password\n"
+                        "(one-time sudo prompt in a terminal)\n"
+                        "No: open a terminal with manual Docker commands")
             result = messagebox.askyesnocancel(
                 "Administrator Privileges Required",
                 message,
-                icon='warning'
+                icon='warning',
+                parent=root
             )
 
-            root.destroy()
-
-            if result is True:  # Yes - open terminal
+            if result is True:  # Yes - install the sudoers rule
+                return self._install_sudoers_rule()
+            elif result is False:  # No - open terminal
                 self._open_docker_terminal()
                 return True
-            elif result is False:  # No - continue without action
-                return False
             else:  # Cancel - user cancelled
                 return False
 
@@ -99,6 +172,18 @@ class GUILabManager:
             print_error(f"Failed to show sudo error dialog: {e}")
             return False
 
+    def _install_sudoers_rule(self) -> bool:
+        """Install the lab sudoers rule and re-check passwordless docker access."""
+        if not install_lab_sudoers_rule():
+            print_warning("Lab sudoers rule was not installed")
+            return False
+        self._sudo_docker_ok = test_sudo_docker_access()
+        if not self._sudo_docker_ok:
+            print_error("Lab sudoers rule was installed but Docker still needs a sudo password")
+            return False
+        print_success("Lab Docker commands no longer need a sudo password")
+        return True
+
     def _open_docker_terminal(self):
         """Open a terminal with helpful Docker commands."""
         try:
@@ -128,32 +213,17 @@ class GUILabManager:
                 'echo "Press Enter to continue..."',
                 'read']
 
-            # Create a script to run in terminal
-            script_content = '#!/bin/bash\n' + '\n'.join(terminal_commands)
-
-            import tempfile
-            import os
-
-            script_fd, script_path = tempfile.mkstemp(suffix='.sh', prefix='stormshadow_lab_')
+            # The script is handed to bash as an argument, so there is no
+            # file to clean up afterwards
+            script_content = '\n'.join(terminal_commands)
 
-            try:
-                with os.fdopen(script_fd, 'w') as f:
-                    f.write(script_content)
-
-                os.chmod(script_path, 0o755)
-
-                # Open in terminal
-                subprocess.Popen([
-                    'gnome-terminal',
-                    '--title', 'StormShadow Lab - Manual Commands',
-                    '--', 'bash', script_path
-                ], start_new_session=True)
-
-                print_info("Opened terminal with manual Docker commands")
+            # Open in whichever terminal emulator is installed
+            subprocess.Popen(build_terminal_command(
+                'StormShadow Lab - Manual Commands',
+                ['bash', '-c', script_content, 'stormshadow-lab']
+            ), start_new_session=True)
 
-            except Exception as e:
-                print_error(f"Failed to create terminal script: {e}")
-                os.close(script_fd)
+            print_info("Opened terminal with manual Docker commands")
 
         except Exception as e:
             print_error(f"Failed to open Docker terminal: {e}")
@@ -162,6 +232,8 @@ class GUILabManager:
         """
         Start the lab environment with GUI-friendly error handling.
 
+        Blocks until the container is up or the start has failed.
+
         Returns:
             bool: True if started successfully
         """
@@ -169,6 +241,9 @@ class GUILabManager:
             print_warning("Lab is already starting")
             return False
 
+        if self._sudo_docker_ok is None:
+            self._probe_sudo_docker()
+
         if self.is_running():
             print_info("Lab is already running")
             return True
@@ -179,71 +254,22 @@ class GUILabManager:
         try:
             # Create lab manager with GUI mode enabled
             self.lab_manager = LabManager(self.config, gui_mode=True, dry_run=False)
-
-            # Start in a separate thread to avoid blocking the GUI
-            def start_thread():
-                try:
-                    print_info("Starting lab manager from GUI...")
-                    if self.lab_manager:
-                        self.lab_manager.start()
-                        # Verify it actually started
-                        time.sleep(1)  # Give it a moment to start
-                        if self.is_running():
-                            self._update_status("Lab started successfully")
-                            print_success("Lab started successfully")
-                        else:
-                            error_msg = "Lab container failed to start properly"
-                            print_error(error_msg)
-                            self._update_status(error_msg)
-                            self.lab_manager = None
-                    else:
-                        raise Exception("Lab manager not initialized")
-                except subprocess.CalledProcessError as e:
-                    error_msg = f"Command failed: {e}"
-                    if "sudo" in str(e) and ("password" in str(e) or "authentication" in str(e)):
-                        print_error(f"Sudo error starting lab: {error_msg}")
-                        self._show_sudo_error_dialog("Lab Start", error_msg)
-                        self._update_status("Lab start failed - sudo required")
-                    else:
-                        print_error(f"Failed to start lab: {error_msg}")
-                        self._update_status(f"Lab start failed: {error_msg}")
-                    self.lab_manager = None
-                except Exception as e:
-                    error_msg = str(e)
-                    print_error(f"Failed to start lab: {error_msg}")
-
-                    # More specific error handling
-                    if "sudo" in error_msg.lower() or "permission" in error_msg.lower():
-                        self._show_sudo_error_dialog("Lab Start", error_msg)
-                        self._update_status("Lab start failed - permissions required")
-                    elif "container did not start" in error_msg.lower():
-                        self._update_status("Lab start failed - container startup timeout")
-                        print_error("Container startup failed. Check Docker daemon and image.")
-                    elif "connection is closed" in error_msg.lower():
-                        self._update_status("Lab start failed - terminal connection error")
-                        print_error(
-                            "Terminal connection failed. Container may be starting in background.")
-                    else:
-                        self._update_status(f"Lab start failed: {error_msg}")
-                    self.lab_manager = None
-                finally:
-                    self._is_starting = False
-
-            thread = threading.Thread(target=start_thread, daemon=True)
-            thread.start()
-            return True
-
+            self._invalidate_status()
         except Exception as e:
             self._is_starting = False
             error_msg = str(e)
             print_error(f"Failed to initialize lab: {error_msg}")
-            self._update_status(f"Lab initialization failed: {error_msg}")
+            self._update_status(f"Lab initialization failed: {error_msg}", "Stopped")
             return False
 
+        return self._do_start()
+
     def stop_lab(self) -> bool:
         """
         Stop the lab environment.
 
+        Blocks until the container has been removed or the stop has failed.
+
         Returns:
             bool: True if stopped successfully
         """
@@ -257,47 +283,14 @@ class GUILabManager:
 
         self._is_stopping = True
         self._update_status("Stopping lab...")
-
-        try:
-            def stop_thread():
-                try:
-                    if self.lab_manager:
-                        print_info("Stopping lab manager...")
-                        self.lab_manager.stop()
-                        # Verify it actually stopped
-                        time.sleep(1)  # Give it a moment to stop
-                        if not self.is_running():
-                            self.lab_manager = None
-                            self._update_status("Lab stopped")
-                            print_success("Lab stopped successfully")
-                        else:
-                            print_warning("Lab may still be running after stop command")
-                            self._update_status("Lab stop may have failed")
-                    else:
-                        self._update_status("Lab was not running")
-                        print_info("Lab manager was not initialized")
-                except Exception as e:
-                    print_error(f"Failed to stop lab: {e}")
-                    self._update_status(f"Lab stop failed: {e}")
-                finally:
-                    self._is_stopping = False
-
-            thread = threading.Thread(target=stop_thread, daemon=True)
-            thread.start()
-            return True
-
-        except Exception as e:
-            self._is_stopping = False
-            print_error(f"Failed to stop lab: {e}")
-            self._update_status(f"Lab stop failed: {e}")
-            return False
+        return self._do_stop()
 
     def restart_lab(self) -> bool:
         """
         Restart the lab environment.
 
         Returns:
-            bool: True if restarted successfully
+            bool: True if the lab is running again
         """
         self._update_status("Restarting lab...")
 
@@ -305,12 +298,90 @@ class GUILabManager:
         if not self.stop_lab():
             return False
 
-        # Wait a moment
-        time.sleep(2)
-
-        # Start again
         return self.start_lab()
 
+    def _do_start(self) -> bool:
+        """Start the lab manager and report whether it came up."""
+        try:
+            print_info("Starting lab manager from GUI...")
+            if self.lab_manager:
+                self.lab_manager.start()
+                self._invalidate_status()
+                # LabManager.start() only returns once the container is
+                # up or its startup wait has timed out; verify which
+                if self.is_running():
+                    self._update_status("Lab started successfully", "Running")
+                    print_success("Lab started successfully")
+                    return True
+                error_msg = "Lab container failed to start properly"
+                print_error(error_msg)
+                self._update_status(error_msg, "Stopped")
+                self.lab_manager = None
+            else:
+                raise Exception("Lab manager not initialized")
+        except subprocess.CalledProcessError as e:
+            error_msg = f"Command failed: {e}"
+            if "sudo" in str(e) and ("password" in str(e) or "authentication" in str(e)):
+                print_error(f"Sudo error starting lab: {error_msg}")
+                # Cached sudo credentials can no longer be trusted
+                reset_sudo_cache()
+                self._show_sudo_error_dialog("Lab Start", error_msg)
+                self._update_status("Lab start failed - sudo required", "Stopped")
+            else:
+                print_error(f"Failed to start lab: {error_msg}")
+                self._update_status(f"Lab start failed: {error_msg}", "Stopped")
+            self.lab_manager = None
+        except Exception as e:
+            error_msg = str(e)
+            print_error(f"Failed to start lab: {error_msg}")
+
+            # More specific error handling
+            if "sudo" in error_msg.lower() or "permission" in error_msg.lower():
+                reset_sudo_cache()
+                self._show_sudo_error_dialog("Lab Start", error_msg)
+                self._update_status("Lab start failed - permissions required", "Stopped")
+            elif "container did not start" in error_msg.lower():
+                self._update_status("Lab start failed - container startup timeout",
+                                    "Stopped")
+                print_error("Container startup failed. Check Docker daemon and image.")
+            elif "connection is closed" in error_msg.lower():
+                self._update_status("Lab start failed - terminal connection error",
+                                    "Stopped")
+                print_error(
+                    "Terminal connection failed. Container may be starting in background.")
+            else:
+                self._update_status(f"Lab start failed: {error_msg}", "Stopped")
+            self.lab_manager = None
+        finally:
+            self._is_starting = False
+        return False
+
+    def _do_stop(self) -> bool:
+        """Stop the lab manager and report whether it is gone."""
+        try:
+            if self.lab_manager:
+                print_info("Stopping lab manager...")
+                self.lab_manager.stop()
+                self._invalidate_status()
+                # LabManager.stop() removes the container synchronously
+                if not self.is_running():
+                    self.lab_manager = None
+                    self._update_status("Lab stopped", "Stopped")
+                    print_success("Lab stopped successfully")
+                    return True
+                print_warning("Lab may still be running after stop command")
+                self._update_status("Lab stop may have failed", "Running")
+                return False
+            self._update_status("Lab was not running", "Stopped")
+            print_info("Lab manager was not initialized")
+            return True
+        except Exception as e:
+            print_error(f"Failed to stop lab: {e}")
+            self._update_status(f"Lab stop failed: {e}")
+            return False
+        finally:
+            self._is_stopping = False
+
     def get_status(self) -> str:
         """
         Get current lab status.
@@ -326,7 +397,7 @@ class GUILabManager:
             return "Stopped"
         else:
             try:
-                status = self.lab_manager.status()
+                status = self._lab_status(self.lab_manager)
                 if status and status.startswith("Up"):
                     return "Running"
                 elif status == "Unknown" or not status:
@@ -347,7 +418,7 @@ class GUILabManager:
             return False
 
         try:
-            status = self.lab_manager.status()
+            status = self._lab_status(self.lab_manager)
             return status.startswith("Up") and status != "Unknown"
         except BaseException:
             return False
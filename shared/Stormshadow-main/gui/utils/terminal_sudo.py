@@ -5,26 +5,114 @@ This module provides utilities to run sudo commands in a terminal window
 when the GUI needs to execute privileged operations.
 """
 
+import functools
+import getpass
 import os
+import shlex
+import shutil
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import List
+from string import Template
+from typing import List, Optional
 from utils.core.logs import print_info, print_error
 
+# Fixed parts of the script generated by create_sudo_script
+_CONFIRM_BLOCK = """
+echo
+echo "Press Enter to continue, or Ctrl+C to cancel..."
+read -r
 
-def create_sudo_script(commands: List[str], description: str = "StormShadow Operation") -> Path:
+echo "Executing commands..."
+echo
+"""
+
+# $$? escapes bash's exit-status variable from Template substitution
+_COMMAND_BLOCK = Template("""echo ">>> Executing: $cmd"
+if sudo $cmd; then
+    echo "✓ Command $index completed successfully"
+else
+    echo "✗ Command $index failed with exit code $$?"
+    echo "Do you want to continue? (y/N)"
+    read -r continue_choice
+    if [[ ! "$$continue_choice" =~ ^[Yy]$$ ]]; then
+        echo "Aborting remaining commands."
+        exit 1
+    fi
+fi
+echo
+""")
+
+_FOOTER_BLOCK = """echo "All commands completed!"
+echo "Press Enter to close this window..."
+read -r
+"""
+
+# Script run_privileged shows in a terminal when pkexec is unavailable; the
+# command's exit status is written to $status for the caller to read
+_PRIVILEGED_TERMINAL_SCRIPT = Template("""echo "StormShadow: "$description
+echo "The following command will be executed with sudo:"
+echo "  "$cmd_text
+echo
+sudo $cmd
+status=$$?
+echo "$$status" > $status
+if [ "$$status" -eq 0 ]; then
+    echo "✓ Command completed successfully"
+else
+    echo "✗ Command failed with exit code $$status"
+fi
+echo "Press Enter to close this window..."
+read -r
+""")
+
+# Drop-in sudoers file letting the lab's docker commands run without a password
+LAB_SUDOERS_PATH = '/etc/sudoers.d/stormshadow-lab'
+
+# Docker invocations made by the lab manager (arguments are sudoers wildcards)
+_LAB_DOCKER_COMMANDS = (
+    'ps *',
+    'images *',
+    'rm -f sip-victim',
+    'logs *',
+    'build -t asterisk-sip-server *',
+    'run *',
+)
+
+# Terminal emulators in order of preference
+_TERMINAL_CANDIDATES = ('xterm', 'kitty', 'mate-terminal', 'gnome-terminal')
+
+# Terminals that return before their command exits and have no option to
+# wait for it (mate-terminal -x); skipped when the caller must block. xterm and
+# kitty run the command in the spawned process itself, gnome-terminal does
+# with --wait
+_NON_BLOCKING_TERMINALS = frozenset({'mate-terminal'})
+
+# Root shell script installing a sudoers rule given as $1. The rule is written
+# to a root-owned temporary file, so it cannot be swapped between the visudo
+# check and the install
+_INSTALL_SUDOERS_SCRIPT = """
+tmp=$(mktemp) || exit 1
+trap 'rm -f "$tmp"' EXIT
+printf '%s' "$1" > "$tmp" &&
+visudo -cf "$tmp" &&
+install -m 0440 -o root -g root "$tmp" "$2"
+"""
+
+
+def build_sudo_script(commands: List[str], description: str = "StormShadow Operation") -> str:
     """
-    Create a temporary script that runs multiple sudo commands.
+    Build the text of a bash script that runs multiple sudo commands.
 
     Args:
         commands: List of shell commands that need sudo
         description: Description of what the script does
 
     Returns:
-        Path: Path to the created script
+        str: The script source
     """
-    script_content = f"""#!/bin/bash
+    # Collect the script as a list of chunks and join once
+    parts: List[str] = [f"""#!/bin/bash
 # {description}
 # Auto-generated sudo script for StormShadow GUI
 
@@ -33,62 +121,56 @@ echo "StormShadow: {description}"
 echo "==================================================="
 echo "The following commands will be executed with sudo:"
 echo
-
-"""
+"""]
 
     # Add each command with echo for visibility
-    for i, cmd in enumerate(commands, 1):
-        script_content += f'echo "  {i}. {cmd}"\n'
+    parts.extend(f'echo "  {i}. {cmd}"' for i, cmd in enumerate(commands, 1))
 
-    script_content += """
-echo
-echo "Press Enter to continue, or Ctrl+C to cancel..."
-read -r
+    parts.append(_CONFIRM_BLOCK)
 
-echo "Executing commands..."
-echo
+    # Add the actual commands
+    parts.extend(
+        _COMMAND_BLOCK.substitute(index=i, cmd=cmd)
+        for i, cmd in enumerate(commands, 1)
+    )
 
-"""
+    parts.append(_FOOTER_BLOCK)
+    return "\n".join(parts)
 
-    # Add the actual commands
-    for i, cmd in enumerate(commands, 1):
-        script_content += f"""echo ">>> Executing: {cmd}"
-if sudo {cmd}; then
-    echo "✓ Command {i} completed successfully"
-else
-    echo "✗ Command {i} failed with exit code $?"
-    echo "Do you want to continue? (y/N)"
-    read -r continue_choice
-    if [[ ! "$continue_choice" =~ ^[Yy]$ ]]; then
-        echo "Aborting remaining commands."
-        exit 1
-    fi
-fi
-echo
 
-"""
+def create_sudo_script(commands: List[str], description: str = "StormShadow Operation") -> Path:
+    """
+    Create a temporary script that runs multiple sudo commands.
 
-    script_content += """echo "All commands completed!"
-echo "Press Enter to close this window..."
-read -r
-"""
+    Args:
+        commands: List of shell commands that need sudo
+        description: Description of what the script does
+
+    Returns:
+        Path: Path to the created script
+    """
+    script_body = build_sudo_script(commands, description).encode()
 
     # Create temporary script file
     script_fd, script_path = tempfile.mkstemp(suffix='.sh', prefix='stormshadow_sudo_')
     script_path_obj = Path(script_path)
 
     try:
-        with os.fdopen(script_fd, 'w') as f:
-            f.write(script_content)
+        # Write straight to the raw fd; no text-mode file object needed
+        view = memoryview(script_body)
+        while view:
+            view = view[os.write(script_fd, view):]
 
         # Make executable
-        os.chmod(script_path, 0o755)
+        os.fchmod(script_fd, 0o755)
         return script_path_obj
 
-    except Exception as e:
-        os.close(script_fd)
+    except Exception:
         script_path_obj.unlink(missing_ok=True)
-        raise e
+        raise
+
+    finally:
+        os.close(script_fd)
 
 
 def run_sudo_commands_in_terminal(commands: List[str],
@@ -106,19 +188,18 @@ def run_sudo_commands_in_terminal(commands: List[str],
         subprocess.Popen: The terminal process
     """
     try:
-        # Create the sudo script
-        script_path = create_sudo_script(commands, description)
+        # The script is handed to bash as an argument, so nothing touches the
+        # filesystem and there is no file to clean up afterwards
+        script = build_sudo_script(commands, description)
 
-        print_info(f"Created sudo script: {script_path}")
         print_info(f"Opening terminal for: {description}")
 
         # Run the script in a new terminal
-        terminal_cmd = [
-            'gnome-terminal',
-            '--title', f'StormShadow: {description}',
-            '--',
-            'bash', str(script_path)
-        ]
+        terminal_cmd = build_terminal_command(
+            f'StormShadow: {description}',
+            ['bash', '-c', script, 'stormshadow-sudo'],
+            wait=wait
+        )
 
         process = subprocess.Popen(terminal_cmd,
                                    start_new_session=True,
@@ -127,20 +208,6 @@ def run_sudo_commands_in_terminal(commands: List[str],
 
         if wait:
             process.wait()
-            # Clean up the script after completion
-            script_path.unlink(missing_ok=True)
-        else:
-            # Schedule cleanup (best effort)
-            def cleanup_later():
-                try:
-                    process.wait()
-                    script_path.unlink(missing_ok=True)
-                except BaseException:
-                    pass
-
-            import threading
-            cleanup_thread = threading.Thread(target=cleanup_later, daemon=True)
-            cleanup_thread.start()
 
         return process
 
@@ -176,12 +243,157 @@ def run_docker_lab_in_terminal(docker_command: str,
     )
 
 
+def lab_sudoers_rule(principal: str, docker_path: str) -> str:
+    """
+    Build the sudoers rule that allows the lab's docker commands without a password.
+
+    SETENV is included because the lab runs docker through ``sudo -E``. Note
+    that ``docker run`` is root-equivalent, so this grants no more than
+    membership of the docker group would.
+
+    Args:
+        principal: User name, or ``%group`` for a group
+        docker_path: Absolute path of the docker binary
+
+    Returns:
+        str: Contents for the sudoers drop-in file
+    """
+    commands = ', '.join(f'{docker_path} {args}' for args in _LAB_DOCKER_COMMANDS)
+    return (
+        "# Installed by StormShadow: lab docker commands without a password prompt\n"
+        f"Cmnd_Alias STORMSHADOW_LAB = {commands}\n"
+        f"{principal} ALL=(root) NOPASSWD:SETENV: STORMSHADOW_LAB\n"
+    )
+
+
+def install_lab_sudoers_rule(principal: Optional[str] = None) -> bool:
+    """
+    Install the lab sudoers rule through a one-time privileged prompt.
+
+    The root shell writes the rule to a root-owned temporary file and checks
+    it with ``visudo -cf`` before copying it into LAB_SUDOERS_PATH, so a bad
+    rule can never lock sudo out. Blocks until the user has answered the prompt.
+
+    Args:
+        principal: User name or ``%group``; defaults to the current user
+
+    Returns:
+        bool: True if the rule was installed
+
+    Raises:
+        FileNotFoundError: If docker is not installed
+    """
+    docker_path = shutil.which('docker')
+    if docker_path is None:
+        raise FileNotFoundError("docker not found in PATH")
+
+    rule = lab_sudoers_rule(principal or getpass.getuser(), docker_path)
+    result = run_privileged(['sh', '-c', _INSTALL_SUDOERS_SCRIPT, 'stormshadow', rule, LAB_SUDOERS_PATH],
+                            "Allow lab Docker commands without a password")
+    return result.returncode == 0
+
+
+def has_polkit() -> bool:
+    """Check if pkexec is available for graphical privilege prompts."""
+    return _pkexec_path() is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _pkexec_path() -> Optional[str]:
+    """Return the path of pkexec, looked up once."""
+    return shutil.which('pkexec')
+
+
+def run_privileged(argv: List[str],
+                   description: str = "StormShadow Operation") -> subprocess.CompletedProcess[bytes]:
+    """
+    Run a command as root, prompting the user for authorization if needed.
+
+    Uses pkexec, whose polkit agent shows a native password dialog, when it is
+    available. Otherwise the command runs under sudo in a terminal window,
+    which writes the command's exit status to a file read once the window
+    is closed; a window closed before that counts as a failure.
+
+    Args:
+        argv: Command to run as root
+        description: Description of what the operation does
+
+    Returns:
+        subprocess.CompletedProcess[bytes]: Result of the command
+    """
+    pkexec = _pkexec_path()
+    if pkexec is not None:
+        print_info(f"Requesting authorization for: {description}")
+        return subprocess.run([pkexec, *argv], check=False)
+
+    with tempfile.TemporaryDirectory(prefix='stormshadow_') as status_dir:
+        status_path = Path(status_dir) / 'status'
+        script = _PRIVILEGED_TERMINAL_SCRIPT.substitute(
+            description=shlex.quote(description),
+            cmd=shlex.join(argv),
+            cmd_text=shlex.quote(shlex.join(argv)),
+            status=shlex.quote(str(status_path)),
+        )
+        print_info(f"Opening terminal for: {description}")
+        terminal_cmd = build_terminal_command(
+            f'StormShadow: {description}',
+            ['bash', '-c', script, 'stormshadow-sudo'],
+            wait=True
+        )
+        # The terminal's own exit code says nothing about the command
+        subprocess.run(terminal_cmd, check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            returncode = int(status_path.read_text().strip())
+        except (OSError, ValueError):
+            print_error(f"No result from the terminal for: {description}")
+            returncode = 1
+    return subprocess.CompletedProcess(argv, returncode)
+
+
+@functools.lru_cache(maxsize=2)
+def _pick_terminal(wait: bool = False) -> Optional[str]:
+    """Return the first available terminal emulator, looked up once per wait mode."""
+    for terminal in _TERMINAL_CANDIDATES:
+        if wait and terminal in _NON_BLOCKING_TERMINALS:
+            continue
+        if shutil.which(terminal):
+            return terminal
+    return None
+
+
+def build_terminal_command(title: str, argv: List[str], wait: bool = False) -> List[str]:
+    """
+    Build the command line that runs argv in a new terminal window.
+
+    Args:
+        title: Window title
+        argv: Command to run inside the terminal
+        wait: Whether the returned command should block until argv exits
+
+    Returns:
+        List[str]: Command line for the chosen terminal emulator
+
+    Raises:
+        FileNotFoundError: If no supported terminal emulator is installed
+    """
+    terminal = _pick_terminal(wait)
+    if terminal is None:
+        tried = [t for t in _TERMINAL_CANDIDATES if not (wait and t in _NON_BLOCKING_TERMINALS)]
+        raise FileNotFoundError(
+            f"No supported terminal emulator found (tried: {', '.join(tried)})")
+
+    if terminal == 'xterm':
+        return ['xterm', '-T', title, '-e', *argv]
+    if terminal == 'kitty':
+        return ['kitty', '--title', title, *argv]
+    if terminal == 'mate-terminal':
+        return ['mate-terminal', '--title', title, '-x', *argv]
+
+    wait_flag = ['--wait'] if wait else []
+    return ['gnome-terminal', '--title', title, *wait_flag, '--', *argv]
+
+
 def check_terminal_available() -> bool:
-    """Check if gnome-terminal is available."""
-    try:
-        result = subprocess.run(['which', 'gnome-terminal'],
-                                capture_output=True,
-                                timeout=5)
-        return result.returncode == 0
-    except BaseException:
-        return False
+    """Check if a supported terminal emulator is available."""
+    return _pick_terminal() is not None
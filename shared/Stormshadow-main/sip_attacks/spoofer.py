@@ -2,26 +2,150 @@ import random
 import signal
 import sys
 import os
-from typing import Optional
-from netfilterqueue import NetfilterQueue, Packet
+from typing import Callable, Optional
+from netfilterqueue import NetfilterQueue, Packet, COPY_PACKET
 from ipaddress import ip_network, IPv4Network, IPv6Network
 
-from utils.core.logs import print_debug, print_error, print_info, print_success, print_warning, set_verbosity
-from scapy.packet import Packet as ScapyPacket
-from scapy.layers.inet import IP, UDP
+from utils.core.logs import print_debug, print_error, print_info, print_success, print_warning, set_verbosity, is_debug_enabled
 import socket
 from types import FrameType
 
 EPHEMERAL_PORTS = range(49152, 65536)
 
+# Random ports are drawn in batches; the ephemeral range spans exactly 2**14 ports.
+# SPOOFER_PORT_POOL_SIZE=0 disables batching and draws one port per packet
+_PORT_POOL_SIZE = int(os.environ.get("SPOOFER_PORT_POOL_SIZE", "1024"))
+_PORT_BITS = 14
+_port_pool: list[int] = []
+_randrange = random.randrange
+
+# Per-packet debug logging gate, refreshed once the verbosity is known so the
+# NFQUEUE handler does not format debug messages that would be filtered out
+_DEBUG = is_debug_enabled()
+
+IPPROTO_UDP = 17
+
+# Largest possible IPv4 datagram; sizes the per-spoofer scratch buffer
+MAX_IP_PACKET = 65535
+
+def ready_socket_address(queue_num: int) -> str:
+    """
+    Address of the Unix datagram socket the spoofer signals readiness on.
+
+    Uses the Linux abstract namespace (leading NUL byte), so there is no file
+    in /tmp to clean up, race on, or fail permission checks across sudo.
+    """
+    return f'\0stormshadow_spoofer_ready_{queue_num}'
+
+# NFQUEUE tuning: a longer kernel queue and a larger netlink receive buffer so
+# bursts are absorbed instead of dropped with ENOBUFS
+NFQUEUE_MAX_LEN = 8192
+NFQUEUE_SOCK_LEN = 2 * 1024 * 1024
+
+def _fold_checksum(total: int) -> int:
+    """Fold a one's complement sum to 16 bits and return its complement."""
+    total = (total & 0xFFFF) + (total >> 16)
+    total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+def spoof_udp_packet(buf: bytearray | memoryview, src_ip: bytes, sport: int) -> None:
+    """
+    Rewrite the source address and port of an IPv4/UDP packet in place.
+
+    The IPv4 header checksum and the UDP checksum (which covers the source
+    address through the pseudo-header) are patched incrementally following
+    RFC 1624, HC' = ~(~HC + ~m + m'), with the changed 16-bit words summed
+    directly from integers so no per-word iteration is needed.
+
+    Args:
+        buf: The raw IPv4 packet (a writable buffer of exactly its length).
+        src_ip: The new source address as 4 packed bytes.
+        sport: The new UDP source port.
+
+    Raises:
+        ValueError: If the packet is not an unfragmented-header IPv4/UDP packet.
+    """
+    if buf[0] >> 4 != 4 or buf[9] != IPPROTO_UDP:
+        raise ValueError("not an IPv4/UDP packet")
+    if len(src_ip) != 4:
+        raise ValueError("spoofed source is not an IPv4 address")
+    if ((buf[6] & 0x1F) << 8) | buf[7]:
+        raise ValueError("non-first IP fragment has no UDP header")
+    ihl = (buf[0] & 0x0F) * 4
+
+    old_src = int.from_bytes(buf[12:16])
+    new_src = int.from_bytes(src_ip)
+    old_sport = (buf[ihl] << 8) | buf[ihl + 1]
+
+    # ~m + m' for the two address words, shared by both checksums
+    addr_delta = (0x1FFFE - (old_src >> 16) - (old_src & 0xFFFF)
+                  + (new_src >> 16) + (new_src & 0xFFFF))
+
+    buf[12:16] = src_ip
+    buf[ihl] = sport >> 8
+    buf[ihl + 1] = sport & 0xFF
+
+    ip_csum = (buf[10] << 8) | buf[11]
+    ip_csum = _fold_checksum((~ip_csum & 0xFFFF) + addr_delta)
+    buf[10] = ip_csum >> 8
+    buf[11] = ip_csum & 0xFF
+
+    # A zero UDP checksum means "no checksum" and must stay that way
+    udp_csum = (buf[ihl + 6] << 8) | buf[ihl + 7]
+    if udp_csum:
+        udp_csum = _fold_checksum((~udp_csum & 0xFFFF) + addr_delta
+                                  + (0xFFFF - old_sport) + sport) or 0xFFFF
+        buf[ihl + 6] = udp_csum >> 8
+        buf[ihl + 7] = udp_csum & 0xFF
+
 def random_ephemeral_port() -> int:
     """
     Generate a random ephemeral port number.
     
+    Ports are served from a pool refilled in batches to amortize the
+    random number generation across many packets, unless batching is
+    disabled with SPOOFER_PORT_POOL_SIZE=0.
+
     Returns:
         int: A random port number between 49152 and 65535.
     """
-    return random.choice(EPHEMERAL_PORTS)
+    if not _port_pool:
+        if _PORT_POOL_SIZE <= 0:
+            return _randrange(EPHEMERAL_PORTS.start, EPHEMERAL_PORTS.stop)
+        base = EPHEMERAL_PORTS.start
+        getrandbits = random.getrandbits
+        _port_pool.extend([base + getrandbits(_PORT_BITS) for _ in range(_PORT_POOL_SIZE)])
+    return _port_pool.pop()
+
+def tune_process() -> None:
+    """
+    Tune the current process for the NFQUEUE packet loop.
+
+    Tracing/profiling hooks are always removed. CPU pinning and real-time
+    scheduling are opt-in through the environment, since the right core and
+    priority depend on the host:
+
+    - SPOOFER_CPU: CPU index to pin the spoofer to (os.sched_setaffinity).
+    - SPOOFER_RT_PRIORITY: SCHED_FIFO priority to run with (requires root).
+    """
+    sys.settrace(None)
+    sys.setprofile(None)
+
+    cpu = os.environ.get("SPOOFER_CPU")
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {int(cpu)})
+            print_debug(f"Spoofer pinned to CPU {cpu}")
+        except (ValueError, OSError) as e:
+            print_warning(f"Could not pin spoofer to CPU {cpu!r}: {e}")
+
+    priority = os.environ.get("SPOOFER_RT_PRIORITY")
+    if priority is not None and hasattr(os, "sched_setscheduler"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(int(priority)))
+            print_debug(f"Spoofer running with SCHED_FIFO priority {priority}")
+        except (ValueError, OSError) as e:
+            print_warning(f"Could not set SCHED_FIFO priority {priority!r}: {e}")
 
 class Spoofer:
     """Class to handle packet spoofing using iptables and netfilterqueue.
@@ -35,8 +159,18 @@ class Spoofer:
 
         self.next_ip_number: int = 0
         self.spoofed_ips: list[str] = [str(ip) for ip in self.spoofed_subnet.hosts()]  # List of spoofed IPs in the subnet
+        # Packed form of spoofed_ips used on the hot path: one contiguous blob of
+        # fixed-width addresses indexed by slicing
+        self._ip_width: int = self.spoofed_subnet.max_prefixlen // 8
+        self._ip_blob: bytes = b''.join(ip.packed for ip in self.spoofed_subnet.hosts())
+        self._n_ips: int = len(self._ip_blob) // self._ip_width
+        # Power-of-two pools advance with a mask instead of a modulo
+        self._ip_mask: int = self._n_ips - 1 if self._n_ips & (self._n_ips - 1) == 0 else 0
         self.netfilter_spoofing_queue: Optional[NetfilterQueue] = None
         self.should_stop: bool = False
+        # Reused for every packet so rewriting does not allocate a bytearray each time
+        self._scratch = bytearray(MAX_IP_PACKET)
+        self._scratch_mv = memoryview(self._scratch)
 
     def get_spoofed_ip(self) -> str:
         """
@@ -50,35 +184,67 @@ class Spoofer:
         self.next_ip_number = (self.next_ip_number + 1) % len(self.spoofed_ips)
         print_debug(f"Get spoofed IP: {ip}")
         return ip
+
+    def get_spoofed_ip_bytes(self) -> bytes:
+        """
+        Get the next spoofed IP address in packed form.
+        Shares the round-robin position with get_spoofed_ip.
+        Returns:
+            bytes: The next spoofed IP address as 4 packed bytes.
+        """
+        i = self.next_ip_number
+        start = i * self._ip_width
+        ip = self._ip_blob[start:start + self._ip_width]
+        if self._ip_mask:
+            self.next_ip_number = (i + 1) & self._ip_mask
+        else:
+            self.next_ip_number = (i + 1) % self._n_ips
+        return ip
     
-    def packet_spoofer(self, packet: Packet) -> None:
+    def make_handler(self) -> Callable[[Packet], None]:
         """
-        Spoof packets from a specific queue by modifying iptables rules.
+        Build the NFQUEUE callback that spoofs packets from this spoofer's queue.
+
+        Everything the callback needs is bound to closure variables up front,
+        so handling a packet does not go through attribute lookups on self
+        or module globals.
 
-        Args:
-            packet: The packet object from NetfilterQueue.
+        Returns:
+            Callable[[Packet], None]: The callback to pass to NetfilterQueue.bind().
         """
+        spoofer = self
+        queue_num = self.attack_queue_num
+        scratch = self._scratch_mv
+        next_ip = self.get_spoofed_ip_bytes
+        next_port = random_ephemeral_port
+        spoof = spoof_udp_packet
+        debug = _DEBUG
 
-        try:
-            print(f"Packet received for queue {self.attack_queue_num}: {packet}")
-            # Here we modify the packet to spoof the source IP
-            pkt: ScapyPacket = IP(packet.get_payload())
-            pkt.src = self.get_spoofed_ip()
-            pkt[UDP].sport = random_ephemeral_port()
-            # We delete the checksums to force Scapy to recalculate them
-            del pkt[IP].chksum
-            del pkt[UDP].chksum
-            packet.set_payload(bytes(pkt))
-            packet.accept()  # Accept the modified packet
-        except Exception as e:
-            print_warning(f"Failed to spoof packet, dropping it: {e}")
-            packet.drop()
-        finally:
-            # Stop condition: if should_stop is set, unbind the queue and exit the thread
-            if self.should_stop and self.netfilter_spoofing_queue is not None:
-                print_debug("Stopping packet spoofing as per request.")
-                self.netfilter_spoofing_queue.unbind()
-            print_debug(f"Packet spoofing completed for queue {self.attack_queue_num}.")
+        def packet_spoofer(packet: Packet) -> None:
+            try:
+                if debug:
+                    print_debug(f"Packet received for queue {queue_num}: {packet}")
+                # Here we modify the packet to spoof the source IP and port in place
+                payload = packet.get_payload()
+                buf = scratch[:len(payload)]
+                buf[:] = payload
+                spoof(buf, next_ip(), next_port())
+                packet.set_payload(bytes(buf))
+                # The rewritten payload travels with this packet's own verdict, so
+                # verdicts cannot be batched (nfq_set_verdict_batch carries none)
+                packet.accept()  # Accept the modified packet
+            except Exception as e:
+                print_warning(f"Failed to spoof packet, dropping it: {e}")
+                packet.drop()
+            finally:
+                # Stop condition: if should_stop is set, unbind the queue and exit the thread
+                if spoofer.should_stop and spoofer.netfilter_spoofing_queue is not None:
+                    print_debug("Stopping packet spoofing as per request.")
+                    spoofer.netfilter_spoofing_queue.unbind()
+                if debug:
+                    print_debug(f"Packet spoofing completed for queue {queue_num}.")
+
+        return packet_spoofer
 
     def cleanup(self, signum: int, frame: Optional[FrameType]):
         # Use an async-signal-safe write to avoid reentrant I/O in logging handlers
@@ -103,10 +269,8 @@ class Spoofer:
 
     def send_ready_signal(self):
         print_debug(f"Waiting for spoofer to signal ready on queue {self.attack_queue_num}")
-        sock_path = f'/tmp/spoofer_ready_{self.attack_queue_num}.sock'
-        client = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
-        client.sendto(b'ready', sock_path)
-        client.close()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as client:
+            client.sendto(b'ready', ready_socket_address(self.attack_queue_num))
 
 if __name__ == "__main__":
     """Main function to run the spoofer."""
@@ -124,7 +288,9 @@ if __name__ == "__main__":
     # Set verbosity if provided (default to "info" if not provided)
     verbosity = sys.argv[6] if len(sys.argv) > 6 else "info"
     set_verbosity(verbosity)
+    _DEBUG = is_debug_enabled()
     print_debug(f"Spoofer verbosity set to: {verbosity}")
+    tune_process()
 
     spoofer = Spoofer(
         attack_queue_num=attack_queue_num,
@@ -147,7 +313,15 @@ if __name__ == "__main__":
         spoofer.netfilter_spoofing_queue = netfilter_spoofing_queue
         print_debug(f"Binding spoofing function to queue {attack_queue_num}")
         try:
-            netfilter_spoofing_queue.bind(attack_queue_num, spoofer.packet_spoofer)
+            # Full packets are copied: the verdict carries the rewritten payload
+            # and the kernel would truncate the packet to a shorter copy range
+            netfilter_spoofing_queue.bind(
+                attack_queue_num,
+                spoofer.make_handler(),
+                max_len=NFQUEUE_MAX_LEN,
+                mode=COPY_PACKET,
+                sock_len=NFQUEUE_SOCK_LEN,
+            )
             print_debug(f"Successfully bound spoofing function to queue {attack_queue_num}")
         except OSError as oe:
             # Provide detailed diagnostic info to help root-cause the bind failure
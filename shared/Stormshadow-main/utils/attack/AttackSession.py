@@ -1,14 +1,11 @@
 from pathlib import Path
-from importlib.util import module_from_spec, spec_from_file_location
-from types import ModuleType
 from typing import Optional, Type
 
 from utils.config.config import Parameters
 from utils.core.logs import print_debug, print_error, print_in_dev, print_info, print_success, print_warning
 from utils.interfaces.attack_interface import AttackInterface, create_attack_instance
 from utils.attack.attack_enums import AttackProtocol, AttackStatus, AttackType
-from utils.attack.attack_modules_finder import find_attack_main_class, check_attack_module_structure
-from utils.network.iptables import generate_suid, remove_rules_for_suid
+from utils.attack.attack_modules_finder import check_attack_module_structure, load_attack_file, resolve_attack_class
 
 
 class AttackSession:
@@ -16,6 +13,9 @@ class AttackSession:
     Base class for all attack modules.
     """
 
+    __slots__ = ("name", "protocol", "main_attack", "dry_run", "status", "enable_spoofing",
+                 "suid", "is_resumable", "dry_run_implemented", "use_default_spoofing", "_rules_created")
+
     def __init__(self, name: str, main_attack: AttackInterface, enable_spoofing: bool, session_uid: Optional[str] = None, dry_run: bool = False) -> None:
         self.name = name
         self.protocol = AttackProtocol.SIP
@@ -26,9 +26,15 @@ class AttackSession:
         self.enable_spoofing = enable_spoofing  # Whether spoofing is enabled or not
 
         # Use provided session UID or generate our own
-        self.suid: str = session_uid or generate_suid()
+        if not session_uid:
+            # Imported here so loading attack modules does not pull in the iptables helpers
+            from utils.network.iptables import generate_suid
+            session_uid = generate_suid()
+        self.suid: str = session_uid
         self.main_attack.set_session_uid(self.suid)
         self.is_resumable = self.main_attack.resume_implemented  # Whether the attack module can be resumed or not
+        self.dry_run_implemented = self.main_attack.dry_run_implemented  # Whether the attack module supports dry-run
+        self._rules_created = False  # Whether spoofing may have added iptables rules tagged with the SUID
         self.use_default_spoofing = not self.main_attack.spoofing_implemented  # Whether to use default spoofing or module spoofing
 
     def start(self) -> None:
@@ -36,7 +42,7 @@ class AttackSession:
         Start the attack.
         """
         
-        print_info(f"Starting attack: {self.name}")
+        print_info("Starting attack: %s", self.name)
         self.status = AttackStatus.RUNNING
         # Implement logic to start the attack
 
@@ -44,14 +50,16 @@ class AttackSession:
             if self.enable_spoofing:
                 print_info("Spoofing is enabled, spoofing would be started.")
             print_info("Running in dry-run mode, no actual attack will be performed.")
-            if not self.main_attack.dry_run_implemented:
+            if not self.dry_run_implemented:
                 print_warning("Dry-run mode is not implemented for this attack module\nModule content not available in dry-run.")
                 return
             else:
-                print_info(f"Dry-run mode is implemented, proceeding with dry-run for {self.name}.")
+                print_info("Dry-run mode is implemented, proceeding with dry-run for %s.", self.name)
                 self.main_attack.dry_run = True
         if self.enable_spoofing:
             print_info("Spoofing is enabled, starting spoofing...")
+            # Set before starting, since a partial start can leave rules behind
+            self._rules_created = not self.dry_run
             if self.use_default_spoofing:
                 print_info("Using default spoofing...")
                 print_in_dev("Default spoofing not implemented yet, using module spoofing instead.")
@@ -66,11 +74,11 @@ class AttackSession:
         """
         Stop the attack.
         """
-        print_info(f"Stopping attack: {self.name}")
+        print_info("Stopping attack: %s", self.name)
         # Implement logic to stop the attack
         try:
             if self.dry_run:
-                if not self.main_attack.dry_run_implemented:
+                if not self.dry_run_implemented:
                     if self.enable_spoofing:
                         print_info("Spoofing is enabled, spoofing would be stopped.")
                     print_info("Dry-run mode is enabled, no actual attack will be stopped.")
@@ -95,14 +103,18 @@ class AttackSession:
             # Now stop the main attack
             self.main_attack.stop()
             self.status = AttackStatus.STOPPED
-            print_info(f"Attack {self.name} stopped successfully.")
+            print_info("Attack %s stopped successfully.", self.name)
             
-            # Best-effort cleanup of any rules with this session SUID
-            try:
-                remove_rules_for_suid(self.suid, dry_run=self.dry_run)
-                remove_rules_for_suid(self.suid, table="nat", dry_run=self.dry_run)
-            except Exception:
-                pass
+            # Best-effort cleanup of any rules with this session SUID. Only
+            # spoofing tags rules with it, so without spoofing there is
+            # nothing to list
+            if self._rules_created:
+                try:
+                    from utils.network.iptables import remove_rules_for_suid
+                    remove_rules_for_suid(self.suid, dry_run=self.dry_run)
+                    remove_rules_for_suid(self.suid, table="nat", dry_run=self.dry_run)
+                except Exception:
+                    pass
         except Exception as e:
             print_error(f"Error stopping attack {self.name}: {e}")
 
@@ -110,21 +122,21 @@ class AttackSession:
         """
         Resume the attack if it was stopped.
         """
-        print_info(f"Resuming attack: {self.name}")
+        print_info("Resuming attack: %s", self.name)
 
         if self.main_attack.dry_run:
-            if not self.main_attack.dry_run_implemented:
+            if not self.dry_run_implemented:
                 print_warning("Dry-run mode is enabled, no actual attack will be resumed.")
                 return
             else:
                 print_info("Dry-run mode is implemented, proceeding with resuming the (fake) attack.")
 
         try :
-            if self.main_attack.resume_implemented:
+            if self.is_resumable:
                 self.status = AttackStatus.RUNNING
-                print_info(f"Resuming attack {self.name}...")
+                print_info("Resuming attack %s...", self.name)
                 self.main_attack.resume()
-                print_info(f"Attack {self.name} resumed successfully.")
+                print_info("Attack %s resumed successfully.", self.name)
             else:
                 print_warning(f"Attack {self.name} cannot be resumed, it was not implemented in the attack module.")
         except Exception as e:
@@ -137,7 +149,7 @@ class AttackSession:
         """
         Cleanup resources used by the attack.
         """
-        print_info(f"Cleaning up attack: {self.name}")
+        print_info("Cleaning up attack: %s", self.name)
         # Implement logic to clean up resources
         pass
     def get_status(self) -> AttackStatus:
@@ -168,39 +180,29 @@ def load_main_attack(py_file: Path) -> Optional[Type[AttackInterface]]:
     Returns:
         An instance of the attack module.
     """
-    print_debug(f"Trying to load attack module from {py_file}")
+    print_debug("Trying to load attack module from %s", py_file)
     # Ensure the directory structure is valid before importing
     module_dir = py_file.parent
-    if not check_attack_module_structure(module_dir):
+    found = check_attack_module_structure(module_dir)
+    if found is None:
         print_warning(f"Module directory failed structure validation: {module_dir}")
         return None
+    found_file, found_class = found
+    if found_file == py_file:
+        print_info("Successfully loaded attack module: %s", py_file)
+        return found_class
     try:
-        spec = spec_from_file_location("attack_module", str(py_file))
-        if spec is None:
-            print_debug(f"Failed to load attack module from {py_file}: Spec is None")
-            return None
-        # Dynamically load the module
-        attack_module : ModuleType = module_from_spec(spec)
-        # Verify if the module has the required interface
-        if spec.loader is None:
-            print_debug(f"Failed to load attack module from {py_file}: Loader is None")
-            return None
-        # Load all classes, functions and variables from the module
-        print_debug(f"Loading attack module from {py_file}")
-        spec.loader.exec_module(attack_module)
-
-        # Look for the main attack class implementing the AttackInterface
-        print_debug(f"Looking for main attack class in {py_file}")
-        main_attack_class: Optional[Type[AttackInterface]] = find_attack_main_class(attack_module)
+        # Files already executed by the structure check are not executed again
+        main_attack_class: Optional[Type[AttackInterface]] = load_attack_file(py_file)
 
         if main_attack_class is None:
             print_warning(f"No valid attack class found in {py_file}")
             return None
-        print_info(f"Successfully loaded attack module: {py_file}")
+        print_info("Successfully loaded attack module: %s", py_file)
         return main_attack_class
 
     except Exception as e:
-        print_debug(f"Failed to import attack module from {py_file} : {e}")
+        print_debug("Failed to import attack module from %s : %s", py_file, e)
         return None
 
 def build_attack_from_module(module: Path, attack_params: Parameters, enable_spoofing: bool, session_uid: Optional[str] = None, open_window: bool = False, dry_run: bool = False) -> Optional[AttackSession]:
@@ -219,7 +221,7 @@ def build_attack_from_module(module: Path, attack_params: Parameters, enable_spo
         An instance of the attack module.
     """
 
-    print_debug(f"Creating attack session from module: {module}")
+    print_debug("Creating attack session from module: %s", module)
 
     if not module.exists():
         print_error(f"Module path does not exist: {module}")
@@ -232,17 +234,13 @@ def build_attack_from_module(module: Path, attack_params: Parameters, enable_spo
     # Load the module dynamically
     try:
         main_attack_class: Optional[Type[AttackInterface]] = None
-        print_debug(f"Loading attack module from path: {module}")
-        print_debug(f"module contents: {list(module.glob('*.py'))}")
-        for py_file in module.glob("*.py"):
-            found_class = load_main_attack(py_file)
-            if found_class is None:
-                print_debug(f"No valid attack class found in {py_file}, skipping.")
-            else:
-                print_debug(f"Found valid attack class in {py_file}: {found_class.__name__}")
-                main_attack_class = found_class
-                break
-                
+        print_debug("Loading attack module from path: %s", module)
+        # Resolved once per module; later builds only check it is unchanged
+        found = resolve_attack_class(module)
+        if found is not None:
+            found_file, main_attack_class = found
+            print_debug("Found valid attack class in %s: %s", found_file, main_attack_class.__name__)
+
         if main_attack_class is None:
             print_error(f"No valid attack module found in {module}")
             raise ImportError(f"No valid attack module found in {module}")
@@ -250,13 +248,10 @@ def build_attack_from_module(module: Path, attack_params: Parameters, enable_spo
         # Create an instance of the attack using the class
         main_attack = create_attack_instance(main_attack_class, attack_params)
         
-        # Set the session UID on the attack instance
-        if session_uid and hasattr(main_attack, 'set_session_uid'):
-            main_attack.set_session_uid(session_uid)
-        
+        # AttackSession sets the session UID on the attack instance
         # Create an instance of the attack session
         attack_session = AttackSession(name=main_attack.attack_name, main_attack=main_attack, enable_spoofing=enable_spoofing, session_uid=session_uid, dry_run=dry_run)
-        print_info(f"Attack session created successfully: {attack_session.get_name()}")
+        print_info("Attack session created successfully: %s", attack_session.get_name())
         return attack_session
     except ImportError as e:
         print_error(f"Error importing attack module. No valid attack module found in {module}: {e}")
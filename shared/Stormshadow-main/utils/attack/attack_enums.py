@@ -2,22 +2,22 @@
 Attack-related enumerations for the SIP attack framework.
 """
 
-from enum import Enum
+from enum import IntEnum, StrEnum
 
-class AttackProtocol(Enum):
+class AttackProtocol(StrEnum):
     SIP = "SIP"
     ICMP = "ICMP"
     HTTP = "HTTP"
     TEMPLATE = "TEMPLATE"  # For template attacks that can be customized
 
-class AttackStatus(Enum):
-    INITIALIZED = "initialized"
-    RUNNING = "running"
-    STOPPED = "stopped"
-    FAILED = "failed"
-    COMPLETED = "completed"
+class AttackStatus(IntEnum):
+    INITIALIZED = 0
+    RUNNING = 1
+    STOPPED = 2
+    FAILED = 3
+    COMPLETED = 4
 
-class AttackType(Enum):
+class AttackType(StrEnum):
     DOS = "DOS"
     DDOS = "DDOS"
     EXPLOIT = "EXPLOIT"
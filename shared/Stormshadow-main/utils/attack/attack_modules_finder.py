@@ -1,15 +1,34 @@
+import os
+import re
+import sys
 from pathlib import Path
 from importlib.util import module_from_spec, spec_from_file_location
 from types import ModuleType
-from typing import Dict, Optional, Type
+from typing import Dict, List, Optional, Tuple, Type
 
 from utils.core.logs import print_debug, print_in_dev, print_warning
 from utils.interfaces.attack_interface import AttackInterface
 
+# Attack files already executed, keyed by (path, mtime_ns, size) so an edited
+# file is executed again. Holds the module and its attack class (None if the
+# file defines no attack class)
+_VALID_MODULE_CACHE: Dict[Tuple[str, int, int], Tuple[ModuleType, Optional[Type[AttackInterface]]]] = {}
+
+# Winning (file, attack class) of each attack module directory, keyed by
+# (path, mtime_ns) of the directory so adding or removing files rescans it
+_MODULE_CLASS_CACHE: Dict[Tuple[str, int], Tuple[Path, Type[AttackInterface]]] = {}
+
+def _attack_module_name(py_file: Path) -> str:
+    """Stable sys.modules name for an attack file, derived from its absolute path."""
+    return "stormshadow_attack_" + re.sub(r"\W", "_", str(py_file))
+
 def find_attack_main_class(module: ModuleType) -> Optional[Type[AttackInterface]]:
     """
     Find the main attack class in the given module.
 
+    Classes defined in the module itself are preferred over ones it imports.
+    If the module declares ``__all__``, only the names it lists are considered.
+
     Args:
         module: The module to search for the attack class.
 
@@ -17,60 +36,175 @@ def find_attack_main_class(module: ModuleType) -> Optional[Type[AttackInterface]
         The first class found that implements AttackInterface, or None if not found.
     """
     print_debug("Searching for attack class in module...")
-    for attr_name in dir(module):
-        attr = getattr(module, attr_name)
-        if isinstance(attr, type) and issubclass(attr, AttackInterface) and attr is not AttackInterface:
-            print_debug(f"Found attack class: {attr_name}")
+    imported: Optional[Type[AttackInterface]] = None
+    # vars() only holds the module's own names; dir() would also sort them.
+    # A module declaring __all__ only has those names checked
+    namespace = vars(module)
+    for attr_name in namespace.get("__all__") or namespace:
+        attr = namespace.get(attr_name)
+        if attr_name.startswith("_") or not isinstance(attr, type):
+            continue
+        if attr is AttackInterface or not issubclass(attr, AttackInterface):
+            continue
+        if attr.__module__ == module.__name__:
+            print_debug("Found attack class: %s", attr_name)
             return attr  # This is the class with the AttackInterface implementation
-    
+        if imported is None:
+            imported = attr
+
+    if imported is not None:
+        print_debug("Found imported attack class: %s", imported.__name__)
+        return imported
     print_debug("No attack class found in module.")
     return None
 
-def check_attack_module_structure(module_path: Path) -> bool:
+def load_attack_file(py_file: Path) -> Optional[Type[AttackInterface]]:
+    """
+    Execute an attack file once and return its attack class.
+
+    The result is cached until the file changes, so validating a module and
+    then loading it only executes each file a single time.
+
+    Args:
+        py_file: Path to the Python file.
+
+    Returns:
+        The attack class defined in the file, or None if there is none.
+
+    Raises:
+        ImportError: If no import spec can be created for the file.
+        Exception: Anything raised while executing the file.
+    """
+    py_file = py_file.resolve()
+    st = py_file.stat()
+    key = (str(py_file), st.st_mtime_ns, st.st_size)
+    cached = _VALID_MODULE_CACHE.get(key)
+    if cached is not None:
+        print_debug("Using cached attack file: %s", py_file)
+        return cached[1]
+
+    name = _attack_module_name(py_file)
+    spec = spec_from_file_location(name, str(py_file))
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Unable to create import spec for: {py_file}")
+    module: ModuleType = module_from_spec(spec)
+    print_debug("Loading attack module from %s", py_file)
+    known_subclasses = set(AttackInterface.__subclasses__())
+    # Registered before executing, as the import system does, so code in the
+    # module that looks itself up (dataclasses, pickle, ...) finds it
+    previous = sys.modules.get(name)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        if previous is not None:
+            sys.modules[name] = previous
+        else:
+            del sys.modules[name]
+        raise
+
+    # A class the file defines directly on AttackInterface shows up as a new
+    # subclass, which avoids scanning the module namespace
+    new_subclasses = [cls for cls in AttackInterface.__subclasses__()
+                      if cls not in known_subclasses and cls.__module__ == module.__name__]
+    attack_class = new_subclasses[0] if new_subclasses else find_attack_main_class(module)
+    _VALID_MODULE_CACHE[key] = (module, attack_class)
+    return attack_class
+
+def list_py_files(module_path: Path) -> List[Path]:
+    """
+    List the Python files directly inside a module directory.
+
+    Uses a single os.scandir pass; the dirent type avoids a stat per entry.
+
+    Args:
+        module_path: Path to the attack module directory.
+
+    Returns:
+        The ``*.py`` files in directory order.
+    """
+    with os.scandir(module_path) as entries:
+        return [Path(entry.path) for entry in entries
+                if entry.name.endswith(".py") and entry.is_file()]
+
+def check_attack_module_structure(module_path: Path, py_files: Optional[List[Path]] = None) -> Optional[Tuple[Path, Type[AttackInterface]]]:
     """
     Check if the attack module has the required structure.
 
     Args:
         module_path: Path to the attack module directory.
+        py_files: The module's Python files if already listed (see list_py_files);
+            the directory is then assumed to exist.
 
     Returns:
-        True if the module has the required structure, False otherwise.
+        The first file defining an attack class together with that class, or
+        None if the module does not have the required structure.
     """
-    # Check if the module path is a directory
-    if not module_path.exists():
-        print_warning(f"Module path does not exist: {module_path}")
-        return False
-    if not module_path.is_dir():
-        print_debug(f"Module path is not a directory: {module_path}")
-        return False
+    if py_files is None:
+        # Check if the module path is a directory
+        if not module_path.exists():
+            print_warning(f"Module path does not exist: {module_path}")
+            return None
+        if not module_path.is_dir():
+            print_debug("Module path is not a directory: %s", module_path)
+            return None
+        py_files = list_py_files(module_path)
     # Check if there is a file implementing the AttackInterface
-    if not any(module_path.glob("*.py")):
+    if not py_files:
         print_warning(f"No Python files found in module path: {module_path}")
-        return False
+        return None
     # Check if the module has at least one valid AttackInterface implementation by
     # attempting a safe dynamic import (same mechanism used at runtime)
-    found_valid = False
-    for py_file in module_path.glob("*.py"):
+    for py_file in py_files:
         try:
-            print_debug(f"Validating attack file: {py_file}")
-            spec = spec_from_file_location(f"attack_module_check_{py_file.stem}", str(py_file))
-            if spec is None or spec.loader is None:
-                print_warning(f"Unable to create import spec for: {py_file}")
-                continue
-            tmp_module: ModuleType = module_from_spec(spec)
-            spec.loader.exec_module(tmp_module)
-            if find_attack_main_class(tmp_module):
-                found_valid = True
-                break
-            else:
-                print_debug(f"File does not define a valid AttackInterface class: {py_file}")
+            print_debug("Validating attack file: %s", py_file)
+            attack_class = load_attack_file(py_file)
+            if attack_class is not None:
+                return py_file, attack_class
+            print_debug("File does not define a valid AttackInterface class: %s", py_file)
         except Exception as e:
             # If a specific file fails to import, log and continue checking others
             print_warning(f"Error validating attack file {py_file}: {e}")
             continue
-    if not found_valid:
-        print_warning(f"No valid attack class found in any file under: {module_path}")
-    return found_valid
+    print_warning(f"No valid attack class found in any file under: {module_path}")
+    return None
+
+def resolve_attack_class(module_path: Path) -> Optional[Tuple[Path, Type[AttackInterface]]]:
+    """
+    Find the attack class of a module directory, reusing the previous result.
+
+    Unlike check_attack_module_structure, a module resolved before is not
+    rescanned: only its directory and winning file are stat'ed to detect changes.
+
+    Args:
+        module_path: Path to the attack module directory.
+
+    Returns:
+        The file defining the attack class together with that class, or None
+        if the module does not have the required structure.
+    """
+    try:
+        key = (str(module_path.resolve()), module_path.stat().st_mtime_ns)
+    except OSError:
+        return check_attack_module_structure(module_path)  # Logs the missing path
+    cached = _MODULE_CLASS_CACHE.get(key)
+    if cached is not None:
+        py_file = cached[0]
+        try:
+            # Re-executes the file only if it was edited since
+            attack_class = load_attack_file(py_file)
+        except Exception as e:
+            print_warning(f"Error reloading attack file {py_file}: {e}")
+            attack_class = None
+        if attack_class is not None:
+            return py_file, attack_class
+        del _MODULE_CLASS_CACHE[key]
+
+    found = check_attack_module_structure(module_path)
+    # Invalid modules are not cached, since fixing a file keeps the directory mtime
+    if found is not None:
+        _MODULE_CLASS_CACHE[key] = found
+    return found
 
 def find_attack_modules(attack_modules_folder: Path) -> Dict[str,Path]:
     """
@@ -79,14 +213,22 @@ def find_attack_modules(attack_modules_folder: Path) -> Dict[str,Path]:
     Returns:
         A list of Path objects representing the paths to available attack modules folders.
     """
-    print_debug(f"Searching for attack modules in: {attack_modules_folder}")
+    print_debug("Searching for attack modules in: %s", attack_modules_folder)
     if not attack_modules_folder.exists() or not attack_modules_folder.is_dir():
         print_warning(f"Attack modules folder does not exist or is not a directory: {attack_modules_folder}")
         return {}
-    print_debug(f"Found attack modules folder: {attack_modules_folder}")
+    print_debug("Found attack modules folder: %s", attack_modules_folder)
     # List all directories in the attack modules folder
     print_debug("Listing all directories in the attack modules folder...")
 
-    attack_modules : Dict[str, Path] = {module.name: module for module in attack_modules_folder.iterdir() if check_attack_module_structure(module)}
+    attack_modules : Dict[str, Path] = {}
+    with os.scandir(attack_modules_folder) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                print_debug("Module path is not a directory: %s", entry.path)
+                continue
+            module = Path(entry.path)
+            if check_attack_module_structure(module, list_py_files(module)) is not None:
+                attack_modules[entry.name] = module
     print_in_dev(f"Found attack modules: {list(attack_modules.keys())}")
     return attack_modules
@@ -5,9 +5,9 @@ It includes configuration types and data structures.
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, cast, Optional, override
+from typing import Dict, Any, List, Sequence, Tuple, cast, Optional, override
 from enum import Enum
-from ..core.logs import print_debug, print_info, print_warning
+from ..core.logs import is_debug_enabled, print_debug, print_info, print_warning
 
 class ConfigType(Enum):
     DEFAULT = "default"
@@ -21,8 +21,25 @@ class ConfigType(Enum):
     DEFENSE = "defense"
     CUSTOM = "custom"
 
-@dataclass
+def _copy_tree(value: Any) -> Any:
+    """Copy the dicts and lists of a parsed config, sharing its immutable leaves."""
+    if isinstance(value, dict):
+        return {k: _copy_tree(v) for k, v in cast(Dict[str, Any], value).items()}
+    if isinstance(value, list):
+        return [_copy_tree(v) for v in cast(List[Any], value)]
+    return value
+
 class Parameters(Dict[str, Any]):
+    # Plain dict subclass: no per-instance __dict__, and no dataclass-generated
+    # __eq__ (which compared every pair of Parameters as equal)
+    __slots__ = ('_flat_cache', '_owner')
+
+    # Types accepted by set()
+    authorized_values = (str, int, float, bool, list, dict, Path)
+    # Exact types of nearly every value set, checked with one hash lookup
+    # before falling back to isinstance() for containers and subclasses
+    _FAST_TYPES = frozenset((str, int, float, bool))
+
     def __init__(self, parameters: Optional[Dict[str, Any]] = None) -> None:
         """
         Initialize Parameters with an optional dictionary.
@@ -33,9 +50,69 @@ class Parameters(Dict[str, Any]):
         if parameters is None:
             print_debug("Initializing Parameters with an empty dictionary.")
             parameters = {}
-        self.authorized_values = (str, int, float, bool, list, dict, Path)
         super().__init__(parameters)
+        self._flat_cache: Optional[Dict[str, Any]] = None
+        # Parameters holding this one as a section (see with_sections), whose
+        # flattened view must be dropped along with this one's
+        self._owner: Optional[Parameters] = None
+
+    def _invalidate(self) -> None:
+        """Drop the cached flattened view of this object and of its owners."""
+        params: Optional[Parameters] = self
+        while params is not None:
+            params._flat_cache = None
+            # Unpickling restores the items before the slots, so _owner may be unset
+            params = getattr(params, '_owner', None)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The flattened view is rebuilt on demand; only the owner link is kept
+        return {'_owner': self._owner}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._flat_cache = None
+        self._owner = state.get('_owner')
     
+    @classmethod
+    def view(cls, parameters: Dict[str, Any]) -> "Parameters":
+        """
+        Wrap a dictionary as Parameters, without copying it if it already is one.
+
+        Unlike Parameters(parameters), changes made through the result are
+        seen by every holder of an existing Parameters object.
+
+        Args:
+            parameters: The dictionary to wrap.
+
+        Returns:
+            parameters itself if it is a Parameters object, otherwise a new one.
+        """
+        if isinstance(parameters, cls):
+            return parameters
+        return cls(parameters)
+
+    @classmethod
+    def with_sections(cls, parameters: Dict[str, Any]) -> "Parameters":
+        """
+        Wrap a configuration dictionary, turning its top-level sections into Parameters.
+
+        Sections can then be handed out with view() instead of being copied;
+        changes made through them also invalidate the result's flatten() cache.
+        Nested dicts and lists are copied, so ``parameters`` itself is never
+        modified through the result.
+
+        Args:
+            parameters: The configuration dictionary (e.g. a parsed config file).
+
+        Returns:
+            A new Parameters object whose dictionary values are Parameters too.
+        """
+        params = cls({key: cls(_copy_tree(value)) if isinstance(value, dict) else _copy_tree(value)
+                      for key, value in parameters.items()})
+        for value in params.values():
+            if isinstance(value, cls):
+                value._owner = params
+        return params
+
     def __repr__(self) -> str:
         """Return a string representation of the Parameters object."""
         return f"Parameters({dict(self)})"
@@ -45,7 +122,7 @@ class Parameters(Dict[str, Any]):
         return f"Parameters({dict(self)})"
     
     @override
-    def get(self, name: str, default: Any = None, path: list[str] = []) -> Any:
+    def get(self, name: str, default: Any = None, path: Sequence[str] = ()) -> Any:
         """
         Get the value of a parameter by its name with a default value.
         
@@ -58,29 +135,29 @@ class Parameters(Dict[str, Any]):
             The value of the parameter or the default value if not found.
         """
 
-        print_debug(f"Getting parameter '{name}' with default '{default}'")
-
-        def _get_recursive(d: Dict[str, Any], path: list[str]) -> Any:
-            if not path:
-                print_debug(f"Returning parameter '{name}' with the value from {d}'")
-                try :
-                    return d[name]
-                except KeyError:
-                    print_warning(f"Parameter '{name}' not found in {d}, returning default value '{default}'")
-                    return default 
-            key = path[0]
-            print_debug(f"Checking path '{key}' in parameters")
+        debug = is_debug_enabled()
+        if debug:
+            print_debug("Getting parameter '%s' with default '%s'", name, default)
 
+        d: Dict[str, Any] = self
+        for key in path:
+            if debug:
+                print_debug("Checking path '%s' in parameters", key)
             if key not in d:
-                print_info(f"Path '{key}' not found in parameters, returning default value.")
+                print_info("Path '%s' not found in parameters, returning default value.", key)
                 return default
-           
-            else:
-                return _get_recursive(d[key], path[1:])
+            d = d[key]
 
-        return _get_recursive(self, path)
+        try:
+            value = d[name]
+        except KeyError:
+            print_warning("Parameter '%s' not found in %s, returning default value '%s'", name, d, default)
+            return default
+        if debug:
+            print_debug("Returning parameter '%s' with the value from %s'", name, d)
+        return value
 
-    def set(self, name: str, value: Any, path: list[str] = []) -> None:
+    def set(self, name: str, value: Any, path: Sequence[str] = ()) -> None:
         """
         Set the value of a parameter by its name.
         
@@ -88,55 +165,81 @@ class Parameters(Dict[str, Any]):
             name: The name of the parameter to set.
             value: The value to assign to the parameter.
         """
-        if not isinstance(value, self.authorized_values):
+        if type(value) not in Parameters._FAST_TYPES and not isinstance(value, Parameters.authorized_values):
             raise ValueError(f"Unsupported type for parameter '{name}': {type(value)}")
-        print_debug(f"Setting parameter '{name}' to '{value}' with path '{path}'")
-        
-        def _set_recursive(d: Dict[str, Any], path: list[str]) -> None:
-            if not path:
-                d[name] = value
-                return
-            
-            key = path[0]
-            
+        if is_debug_enabled():
+            print_debug("Setting parameter '%s' to '%s' with path '%s'", name, value, path)
+
+        d: Dict[str, Any] = self
+        for key in path:
             if key not in d:
-                if len(path) > 0:
-                    print_warning(f"Creating new path '{key}' in parameters because it does not exist.")
-                    d[key] = {}
-                else:
-                    print_warning(f"Creating new key '{key}' in parameters because it does not exist.")
-                    d[key] = value
-                    return
-            if len(path) == 1:
-                print_debug(f"Adding {name} with value {value}")
-                d[key][name] = value
-            else:
-                _set_recursive(d[key], path[1:])
-        _set_recursive(self, path)
+                print_warning("Creating new path '%s' in parameters because it does not exist.", key)
+                d[key] = {}
+            d = d[key]
+        d[name] = value
+        self._invalidate()
     
     def flatten(self) -> Dict[str, Any]:
         """
         Flatten the parameters dictionary to a single level.
+
+        The flattened view is cached until the parameters are modified through
+        this object or one of its sections (set(), item assignment/deletion,
+        update(), ...); changes made directly on plain nested dicts are not
+        tracked.
         
         Returns:
-            A flattened dictionary with all parameters.
+            A flattened dictionary with all parameters (a fresh copy on each call).
         """
-        print_debug("Flattening parameters dictionary")
-        flat_params: Parameters = Parameters({})
-
-        def _flatten(d: Dict[str, Any], parent_key: str = '') -> None:
-            for k, v in d.items():
-                new_key = f"{parent_key}.{k}" if parent_key else k
-                if isinstance(v, dict):
-                    v_str_dict = cast(Dict[str, Any], v)
-                    _flatten(v_str_dict, new_key)
+        if self._flat_cache is None:
+            print_debug("Flattening parameters dictionary")
+            flat: Dict[str, Any] = {}
+            # Depth-first with an explicit stack of iterators, keeping key order
+            stack = [("", iter(self.items()))]
+            while stack:
+                parent_key, items = stack[-1]
+                for k, v in items:
+                    new_key = f"{parent_key}.{k}" if parent_key else k
+                    if isinstance(v, dict):
+                        stack.append((new_key, iter(cast(Dict[str, Any], v).items())))
+                        break
+                    flat[new_key] = v
                 else:
-                    flat_params[new_key] = v
+                    stack.pop()
+            self._flat_cache = flat
+
+        # Callers are free to modify the result, so never hand out the cache
+        return Parameters(self._flat_cache)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._invalidate()
+        super().__setitem__(key, value)
 
-        _flatten(self)
-        return flat_params
+    def __delitem__(self, key: str) -> None:
+        self._invalidate()
+        super().__delitem__(key)
 
-@dataclass
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self._invalidate()
+        super().update(*args, **kwargs)
+
+    def pop(self, *args: Any) -> Any:
+        self._invalidate()
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[str, Any]:
+        self._invalidate()
+        return super().popitem()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        self._invalidate()
+        return super().setdefault(key, default)
+
+    def clear(self) -> None:
+        self._invalidate()
+        super().clear()
+
+@dataclass(slots=True)
 class Config:
     # Contain the configuration type
     config_type: ConfigType
@@ -144,6 +247,39 @@ class Config:
     parameters: Parameters
 
 
+# Parameter paths used by the CLI mapping below
+_APP_ENABLED = ("app", "enabled")
+_ATTACK = ("attack",)
+_LOG = ("log",)
+_METRICS = ("metrics",)
+_LAB = ("lab",)
+_CUSTOM = ("custom",)
+
+# CLI arguments that are stored as-is: key -> (parameter name, parameter path)
+_CLI_PARAMETERS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "attack": ("attack", _APP_ENABLED),
+    "lab": ("lab", _APP_ENABLED),
+    "metrics": ("metrics", _APP_ENABLED),
+    "defense": ("defense", _APP_ENABLED),
+    "gui": ("gui", _APP_ENABLED),
+    "verbosity": ("verbosity_level", _LOG),
+    "dry_run": ("dry_run", _APP_ENABLED),
+    "target_ip": ("target_ip", _ATTACK),
+    "target_port": ("target_port", _ATTACK),
+    "spoofing_enabled": ("spoofing", _APP_ENABLED),
+    "return_path_enabled": ("return_path", _APP_ENABLED),
+    "log_file_on": ("log_file", _APP_ENABLED),
+    "metrics_on": ("metrics", _APP_ENABLED),
+}
+
+# Component flags set by each --mode value
+_MODE_FLAGS: Dict[str, Tuple[Tuple[str, bool], ...]] = {
+    "lab": (("lab", True), ("attack", False)),
+    "attack": (("attack", True), ("lab", False)),
+    "both": (("lab", True), ("attack", True)),
+    "gui": (("gui", True),),
+}
+
 def UpdateDefaultConfigFromCLIArgs(config: Config, args: Parameters) -> None:
     """
     Convert command line parameters to a Config object.
@@ -154,146 +290,89 @@ def UpdateDefaultConfigFromCLIArgs(config: Config, args: Parameters) -> None:
     Returns:
         Config: Config object with the provided parameters
     """
-    print_info(f"Converting command line parameters to Config: {args}")
+    print_info("Converting command line parameters to Config: %s", args)
 
     parameters : Parameters = config.parameters
 
     for key, value in args.items():
+        simple = _CLI_PARAMETERS.get(key)
+        if simple is not None:
+            name, path = simple
+            print_debug("Setting %s to '%s'", name, value)
+            parameters.set(name, value, path)
+            continue
+
         match key:
             case "mode":
                 # Set the mode in the parameters
-                print_debug(f"Setting mode to '{value}'")
-
-                match value:
-                    case "lab":
-                        parameters.set("lab", True, ["app", "enabled"])
-                        parameters.set("attack", False, ["app", "enabled"])
-                    case "attack":
-                        parameters.set("attack", True, ["app", "enabled"])
-                        parameters.set("lab", False, ["app", "enabled"])
-                    case "both":
-                        parameters.set("lab", True, ["app", "enabled"])
-                        parameters.set("attack", True, ["app", "enabled"])
-                    case "gui":
-                        parameters.set("gui", True, ["app", "enabled"])
-                    case _ :
-                        print_warning(f"Unknown mode '{value}', default parameters will be used.")
-                        pass
-            case "attack":
-                # Set the attack mode
-                    print_debug(f"Setting attack mode to {value}")
-                    parameters.set("attack", value, ["app", "enabled"])
-            case "lab":
-                # Set the lab mode
-                print_debug(f"Setting lab mode to {value}")
-                parameters.set("lab", value, ["app", "enabled"])
-            case "metrics":
-                # Set the metrics mode
-                print_debug(f"Setting metrics mode to {value}")
-                parameters.set("metrics", value, ["app", "enabled"])
-            case "defense":
-                # Set the defense mode
-                print_debug(f"Setting defense mode to {value}")
-                parameters.set("defense", value, ["app", "enabled"])
-            case "gui":
-                # Set the GUI mode
-                print_debug(f"Setting GUI mode to {value}")
-                parameters.set("gui", value, ["app", "enabled"])
-            case "verbosity":
-                # Set the verbosity level
-                print_info(f"Setting verbosity level to '{value}'")
-                parameters.set("verbosity_level", value, ["log"])
-            case "dry_run":
-                # Set dry run mode
-                print_debug(f"Setting dry run mode to '{value}'")
-                parameters.set("dry_run", value, ["app", "enabled"])
-            case "target_ip":
-                # Set the target IP address
-                print_debug(f"Setting target IP to '{value}'")
-                parameters.set("target_ip", value, ["attack"])
-            case "target_port":
-                # Set the target port
-                print_debug(f"Setting target port to '{value}'")
-                parameters.set("target_port", value, ["attack"])
+                print_debug("Setting mode to '%s'", value)
+                flags = _MODE_FLAGS.get(value)
+                if flags is None:
+                    print_warning("Unknown mode '%s', default parameters will be used.", value)
+                    continue
+                for flag, enabled in flags:
+                    parameters.set(flag, enabled, _APP_ENABLED)
             case "attack_name":
                 # Set the attack name
-                print_debug(f"Setting attack name to '{value}' and enabling attack mode")
-                parameters.set("attack_name", value, ["attack"])
-                parameters.set("attack", True, ["app", "enabled"])
-
-            case "spoofing_enabled":
-                # Set spoofing enabled/disabled
-                print_debug(f"Setting spoofing enabled to '{value}'")
-                parameters.set("spoofing", value, ["app", "enabled"])
-            case "return_path_enabled":
-                # Set return path enabled/disabled
-                print_debug(f"Setting return path enabled to '{value}'")
-                parameters.set("return_path", value, ["app", "enabled"])
-            case "log_file_on":
-                # Set log file enabled/disabled
-                print_debug(f"Setting log file enabled to '{value}'")
-                parameters.set("log_file", value, ["app", "enabled"])
-            case "metrics_on":
-                # Set metrics enabled/disabled
-                print_debug(f"Setting metrics enabled to '{value}'")
-                parameters.set("metrics", value, ["app", "enabled"])
+                print_debug("Setting attack name to '%s' and enabling attack mode", value)
+                parameters.set("attack_name", value, _ATTACK)
+                parameters.set("attack", True, _APP_ENABLED)
             case "log_file":
                 # Set log file path
                 if isinstance(value, str):
-                    print_debug(f"Setting log file path to '{value}'")
-                    parameters.set("file", value, ["log"])
+                    print_debug("Setting log file path to '%s'", value)
+                    parameters.set("file", value, _LOG)
             case "log_format":
                 # Set log format
                 if isinstance(value, str):
-                    print_debug(f"Setting log format to '{value}'")
+                    print_debug("Setting log format to '%s'", value)
                     print_warning("Not implemented yet, will be set in the logger setup"
                                   "with simple format settings with simple letters like "
                                   "--log_format anlm for asctime, name, levelname and message")
-                pass
             case "max_count":
                 # Set maximum count for attacks
                 if isinstance(value, int):
-                    print_debug(f"Setting maximum count to '{value}'")
-                    parameters.set("max_count", value, ["attack"])
+                    print_debug("Setting maximum count to '%s'", value)
+                    parameters.set("max_count", value, _ATTACK)
                 else:
-                    print_warning(f"Unsupported type for max_count: {type(value)}. Expected int.")
+                    print_warning("Unsupported type for max_count: %s. Expected int.", type(value))
             case "delay":
                 # Set delay between packets for attacks
                 if isinstance(value, (int, float)):
-                    print_debug(f"Setting delay to '{value}' seconds")
-                    parameters.set("delay", value, ["attack"])
+                    print_debug("Setting delay to '%s' seconds", value)
+                    parameters.set("delay", value, _ATTACK)
                 else:
-                    print_warning(f"Unsupported type for delay: {type(value)}. Expected int or float.")
+                    print_warning("Unsupported type for delay: %s. Expected int or float.", type(value))
             case "open_window":
                 # Set whether to open a new terminal window for the attack
                 if isinstance(value, bool) :
-                    print_debug(f"Setting open_window to '{value}' on attack, lab and metrics")
-                    parameters.set("open_window", value, ["app", "enabled"])
-                    parameters.set("open_window", value, ["attack"])
-                    parameters.set("open_window", value, ["metrics"])
-                    parameters.set("open_window", value, ["lab"])
+                    print_debug("Setting open_window to '%s' on attack, lab and metrics", value)
+                    parameters.set("open_window", value, _APP_ENABLED)
+                    parameters.set("open_window", value, _ATTACK)
+                    parameters.set("open_window", value, _METRICS)
+                    parameters.set("open_window", value, _LAB)
                     
             case _:
                 if value is not None:
                     # Set custom parameters
-                    if isinstance(value, parameters.authorized_values):
-                        print_debug(f"Setting custom parameter '{key}' to '{value}'")
-                        parameters.set(key, value, ["custom"])
+                    if isinstance(value, Parameters.authorized_values):
+                        print_debug("Setting custom parameter '%s' to '%s'", key, value)
+                        parameters.set(key, value, _CUSTOM)
                     else:
-                        print_warning(f"Unsupported type for custom parameter '{key}': {type(value)}")
+                        print_warning("Unsupported type for custom parameter '%s': %s", key, type(value))
                 else:
-                    print_warning(f"Skipping parameter '{key}' because its value is None")
+                    print_warning("Skipping parameter '%s' because its value is None", key)
 
     config.parameters = parameters
-    print_debug(f"Updated config parameters: {config.parameters}")
+    print_debug("Updated config parameters: %s", config.parameters)
 
 def UpdateFlatConfig(config:Config, new_parameters: Parameters):
-    print_debug(f"Old flat config parameters: {config.parameters}")
+    print_debug("Old flat config parameters: %s", config.parameters)
     for key, value in new_parameters.items():
         if key in config.parameters:
             config.parameters[key] = value
-            print_debug(f"Updated flat config parameter '{key}' to '{value}'")
+            print_debug("Updated flat config parameter '%s' to '%s'", key, value)
         else:
-            print_warning(f"Unknown flat config parameter '{key}'")
-    print_debug(f"Final flat config parameters: {config.parameters}")
+            print_warning("Unknown flat config parameter '%s'", key)
+    print_debug("Final flat config parameters: %s", config.parameters)
     
\ No newline at end of file
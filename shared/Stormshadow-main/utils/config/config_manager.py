@@ -9,7 +9,8 @@ This module handles loading configurations from various sources with proper prec
 
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from functools import cached_property, lru_cache
+from typing import Dict, Any, Optional, Tuple
 
 from utils.network.iptables import get_current_iptables_queue_num
 
@@ -19,10 +20,78 @@ from ..core.system_utils import get_interface, get_interface_ip
 
 from .config import Config, ConfigType, Parameters, UpdateDefaultConfigFromCLIArgs
 
+# Configuration file used when ConfigManager is not given one
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "configs" / "sip-stormshadow-config.yaml"
+
+# libyaml's C parser when PyYAML was built with it; same results as SafeLoader
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Number of parsed YAML config files kept; the app only reloads a handful
+_YAML_CACHE_SIZE = 4
+
+@lru_cache(maxsize=_YAML_CACHE_SIZE)
+def _parse_yaml_file(path: Path, key: Tuple[int, int, int, int]) -> Any:
+    """Parse a YAML file; key (device, inode, mtime_ns, size) makes edits miss the cache."""
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+def _load_yaml_file(path: Path) -> Any:
+    """
+    Parse a YAML file, reusing the previous result while the file is unchanged.
+
+    Args:
+        path: Path to the YAML file.
+
+    Returns:
+        The parsed content, shared with later loads of the same file: it must
+        not be modified (Parameters.with_sections copies it).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    st = path.stat()
+    # The inode identifies the file without resolving the path
+    return _parse_yaml_file(path, (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size))
+
+# Parameters that may be set to "auto" in the config file, grouped by the
+# path of the section holding them
+_AUTO_CONFIG_KEYS: Tuple[Tuple[Tuple[str, ...], Tuple[str, ...]], ...] = (
+    (("attack",), ("target_ip", "target_port", "source_port", "attack_queue_num", "interface", "open_window")),
+    (("network",), ("interface", "own_ip")),
+    (("metrics",), ("ack_port", "ack_return_queue_num", "open_window")),
+    (("lab",), ("interface", "server_ip", "open_window")),
+    (("lab", "return_path"), ("dnat_target_ip", "dnat_port", "spoofed_subnet")),
+)
+
+# ConfigManager attribute holding the configuration of each type
+_CONFIG_ATTRS: Dict[ConfigType, str] = {
+    ConfigType.APP: "app_config",
+    ConfigType.ATTACK: "attack_config",
+    ConfigType.LAB: "lab_config",
+    ConfigType.METRICS: "metrics_config",
+    ConfigType.DEFENSE: "defense_config",
+    ConfigType.GUI: "gui_config",
+    ConfigType.CUSTOM: "custom_configs",
+}
+
+# Section of the default config each configuration is built from, and its
+# name in the error raised when the section is missing or empty (None when
+# the section is optional)
+_CONFIG_SECTIONS: Dict[ConfigType, Tuple[str, Optional[str]]] = {
+    ConfigType.APP: ("app", "App"),
+    ConfigType.ATTACK: ("attack", "Attack"),
+    ConfigType.LAB: ("lab", "Lab"),
+    ConfigType.METRICS: ("metrics", "Metrics"),
+    ConfigType.DEFENSE: ("defense", None),
+    ConfigType.GUI: ("gui", "GUI"),
+    ConfigType.CUSTOM: ("custom", None),
+}
+
 def get_available_queue_num() -> int:
     """
-    Placeholder function to check the current queue number.
-    This should be implemented to return the actual queue number of the machine.
+    Return the queue number following the highest NFQUEUE queue in use.
+
+    Each call lists the iptables rules, so resolve it once and reuse the result.
     """
     return get_current_iptables_queue_num() + 1
 
@@ -33,35 +102,15 @@ class ConfigManager:
     If a config path is provided, it uses that path to load the configuration.
     """
     def __init__(self, CLI_Args: Optional[Parameters] = None, default_config_path: Optional[Path]=None) -> None:
-        if default_config_path is None:
-            self.config_file_path = Path(__file__).resolve().parents[2]/ "configs" / "sip-stormshadow-config.yaml"
-        else:
-            self.config_file_path = default_config_path
-
-        if not self.config_file_path.exists():
-            raise FileNotFoundError(f"Config file not found: {self.config_file_path}")
-        print_debug(f"Default Config file path: {self.config_file_path}")
-
-        # Contain the shared configuration for every parts of the application
-        self.app_config: Config
-        # Contain the configuration for the attack module
-        self.attack_config: Config
-        # Contain the configuration for the lab module
-        self.lab_config: Config
-        # Contain the configuration for the metrics module
-        self.metrics_config: Config
-        # Contain the configuration for the defense module
-        self.defense_config: Config
-        # Contain the configuration for the GUI
-        self.gui_config: Config
-        # Allow to load custom configurations for personalized modules
-        self.custom_configs: Config
+        self.config_file_path = DEFAULT_CONFIG_PATH if default_config_path is None else default_config_path
+        print_debug("Default Config file path: %s", self.config_file_path)
+
         # Load the default configuration file
         default_config = self._load_default_config_file()
         # If CLI arguments are provided, update the default configuration
-        print_debug(f"Show default configuration file : {default_config}")
+        print_debug("Show default configuration file : %s", default_config)
         if CLI_Args:
-            print_debug(f"Updating default configuration with CLI arguments: {CLI_Args}")
+            print_debug("Updating default configuration with CLI arguments: %s", CLI_Args)
             UpdateDefaultConfigFromCLIArgs(default_config, CLI_Args)
             print_success("Default configuration updated with CLI arguments.")
         else:
@@ -75,28 +124,64 @@ class ConfigManager:
         # Use the default configuration file
         # and resolve any auto configurations
         # to ensure all parameters are set correctly
-        default_config = self._resolve_auto_configs(default_config)
-
-        # Load all configurations based on the default config
-        self._load_app_config(default_config)
-        self._load_attack_config(default_config)
-        self._load_lab_config(default_config)
-        self._load_metrics_config(default_config)
-        self._load_defense_config(default_config)
-        self._load_gui_config(default_config)
-        self._load_custom_configs(default_config)
+        self._default_config = self._resolve_auto_configs(default_config)
+
+        # Required sections are checked now, so a broken config file fails
+        # here rather than on first use of the module configuration
+        parameters = self._default_config.parameters
+        for key, label in _CONFIG_SECTIONS.values():
+            if label is not None and not dict.get(parameters, key):
+                raise ValueError(f"{label} configuration is missing in the default config.")
+
+        # The per-module configurations are built from it on first access
+        for name in _CONFIG_ATTRS.values():
+            self.__dict__.pop(name, None)
+
+    @cached_property
+    def app_config(self) -> Config:
+        """Shared configuration for every parts of the application."""
+        return self._load_config(ConfigType.APP)
+
+    @cached_property
+    def attack_config(self) -> Config:
+        """Configuration for the attack module."""
+        return self._load_config(ConfigType.ATTACK)
+
+    @cached_property
+    def lab_config(self) -> Config:
+        """Configuration for the lab module."""
+        return self._load_config(ConfigType.LAB)
+
+    @cached_property
+    def metrics_config(self) -> Config:
+        """Configuration for the metrics module."""
+        return self._load_config(ConfigType.METRICS)
+
+    @cached_property
+    def defense_config(self) -> Config:
+        """Configuration for the defense module."""
+        return self._load_config(ConfigType.DEFENSE)
+
+    @cached_property
+    def gui_config(self) -> Config:
+        """Configuration for the GUI."""
+        return self._load_config(ConfigType.GUI)
+
+    @cached_property
+    def custom_configs(self) -> Config:
+        """Custom configurations for personalized modules."""
+        return self._load_config(ConfigType.CUSTOM)
 
     def _load_default_config_file(self) -> Config:
         default_config_path = self.config_file_path
-        if not default_config_path.exists():
-            raise FileNotFoundError(f"Default config path not found: {default_config_path}")
-
-        with open(default_config_path, "r") as f:
-            yaml_content: Dict[str, Any] = yaml.safe_load(f)
+        try:
+            yaml_content: Dict[str, Any] = _load_yaml_file(default_config_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Default config path not found: {default_config_path}") from None
         
-        print_debug(f"Default configuration loaded from {default_config_path}")
-        parameters=Parameters(yaml_content)
-        print_debug(f"Default configuration parameters: {parameters}")
+        print_debug("Default configuration loaded from %s", default_config_path)
+        parameters=Parameters.with_sections(yaml_content)
+        print_debug("Default configuration parameters: %s", parameters)
         
         default_config = Config(
             config_type=ConfigType.DEFAULT,
@@ -108,47 +193,31 @@ class ConfigManager:
     def _resolve_auto_configs(self, default_config: Config) -> Config:
         
         parameters = default_config.parameters
-        auto_to_resolve = [
-            ["attack", "target_ip"],
-            ["attack", "target_port"],
-            ["attack", "source_port"],
-            ["attack", "attack_queue_num"],
-            ["attack", "interface"],
-            ["network", "interface"],
-            ["network", "own_ip"],
-            ["metrics", "ack_port"],
-            ["metrics", "ack_return_queue_num"],
-            ["lab", "interface"],
-            ["lab", "server_ip"],
-            ["lab", "return_path", "dnat_target_ip"],
-            ["lab", "return_path", "dnat_port"],
-            ["lab", "return_path", "spoofed_subnet"],
-            ["metrics", "open_window"],
-            ["lab", "open_window"],
-            ["attack", "open_window"]
-        ]
-
-        # Get default values for auto configurations
-        default_sip_port = parameters.get("sip_port", 5060, ["network"])
-        default_ack_port = parameters.get("ack_port", 4000, ["metrics"])
-        default_interface = parameters.get("interface", "auto", ["network"])
-        default_ip = parameters.get("own_ip", "auto", ["network"])
-        first_queue_num = parameters.get("first_queue_num", "auto", ["network"])
+        # Get default values for auto configurations
+        default_sip_port = parameters.get("sip_port", 5060, ("network",))
+        default_ack_port = parameters.get("ack_port", 4000, ("metrics",))
+        default_interface = parameters.get("interface", "auto", ("network",))
+        default_ip = parameters.get("own_ip", "auto", ("network",))
+        first_queue_num = parameters.get("first_queue_num", "auto", ("network",))
 
         # Check if the interface is set, if not, use the default one
         if default_interface == "auto":
             default_interface = get_interface()
-            print_debug(f"Using default interface: {default_interface}")
+            print_debug("Using default interface: %s", default_interface)
         # Check if the IP is set, if not, use the default one
         if default_ip == "auto":
             default_ip = get_interface_ip(default_interface)
         
-        # Resolve auto configurations
-        for path in auto_to_resolve:
-            k = path[-1]
-            # v = find_value_by_path(parameters, path)
-            v = parameters.get(k, "auto", path[:-1])
-            if v == "auto":
+        # Resolve auto configurations, walking down to each section only once
+        for section_path, keys in _AUTO_CONFIG_KEYS:
+            section: Any = parameters
+            for key in section_path:
+                section = dict.get(section, key) if isinstance(section, dict) else None
+            if not isinstance(section, dict):
+                section = {}  # Missing section: its keys are "auto" and set() creates it
+            for k in keys:
+                if section.get(k, "auto") != "auto":
+                    continue
                 value = None
                 # Resolve the auto value based on the context
                 match k:
@@ -161,15 +230,14 @@ class ConfigManager:
                     case "source_port":
                         # Use the ack port from metrics config
                         value = default_ack_port
-                    case "attack_queue_num":
-                        # Use the first available queue number for the attack
-                        value = first_queue_num if first_queue_num != "auto" else get_available_queue_num() 
-                    case "ack_return_queue_num":
-                        # Increment the first queue number for ACK return
-                        value = first_queue_num if first_queue_num != "auto" else get_available_queue_num()
+                    case "attack_queue_num" | "ack_return_queue_num":
+                        # Use the first available queue number, listing iptables at most once
+                        if first_queue_num == "auto":
+                            first_queue_num = get_available_queue_num()
+                        value = first_queue_num
                     case "interface":
                         # Use the interface from network config
-                        print_debug(f"Using interface: {default_interface}")
+                        print_debug("Using interface: %s", default_interface)
                         value = default_interface
                     case "server_ip":
                         # Use the interface from network config (simulate IP from interface)
@@ -182,98 +250,49 @@ class ConfigManager:
                         value = default_sip_port
                     case "spoofed_subnet":
                         # Use the attack spoofing subnet
-                        value = parameters.get("spoofing_subnet", "10.10.123.0/25", ["attack"])
+                        value = parameters.get("spoofing_subnet", "10.10.123.0/25", ("attack",))
                     case "open_window":
                         # Use the app open_window parameter
-                        value = parameters.get("open_window", True, ["app", "enabled"])
+                        value = parameters.get("open_window", True, ("app", "enabled"))
                     case _ : pass  # No specific action for other keys
                 # If a value is resolved, set it in the parameters
                 if value is not None:
                     # Set the resolved value in the parameters
-                    parameters.set(k, value, path[:-1])
-        print_debug(f"Resolved parameters: {parameters}")
+                    parameters.set(k, value, section_path)
+        print_debug("Resolved parameters: %s", parameters)
         return Config(
             config_type=ConfigType.DEFAULT,
             parameters=parameters
         )
 
-    def _load_app_config(self, default_config: Config) -> None:
-        parameters : Dict[str, Any] = default_config.parameters["app"] if "app" in default_config.parameters else {}
-        if parameters == {}:
-            raise ValueError("App configuration is missing in the default config.")
-        
-        self.app_config = Config(
-            config_type=ConfigType.APP,
-            parameters=Parameters(parameters)
-        )
-
-    def _load_attack_config(self, default_config: Config) -> None:
-        attack_parameters : Dict[str, Any]= default_config.parameters["attack"] if "attack" in default_config.parameters else {}
-
-        if not attack_parameters:
-            raise ValueError("Attack configuration is missing in the default config.")
-
-        self.attack_config = Config(
-            config_type=ConfigType.ATTACK,
-            parameters=Parameters(attack_parameters)
-        )
-
-    def _load_lab_config(self, default_config: Config) -> None:
-        lab_parameters : Dict[str, Any] = default_config.parameters["lab"] if "lab" in default_config.parameters else {}
-
-        if not lab_parameters:
-            raise ValueError("Lab configuration is missing in the default config.")
-
-        self.lab_config = Config(
-            config_type=ConfigType.LAB,
-            parameters=Parameters(lab_parameters)
-        )
-
-    def _load_metrics_config(self, default_config: Config) -> None:
-        metrics_parameters : Dict[str, Any] = default_config.parameters["metrics"] if "metrics" in default_config.parameters else {}
-        if not metrics_parameters:
-            raise ValueError("Metrics configuration is missing in the default config.")
-
-        self.metrics_config = Config(
-            config_type=ConfigType.METRICS,
-            parameters=Parameters(metrics_parameters)
-        )
-
-    def _load_defense_config(self, default_config: Config) -> None:
-
-        try:
-            defense_parameters : Dict[str, Any] = default_config.parameters["defense"] if "defense" in default_config.parameters else {}
-            if not defense_parameters:
-                raise ValueError("Defense configuration is missing in the default config.")
-
-        except Exception as e:
-            print_warning(f"No defense implementation for now: {e}")
-            defense_parameters = {}
-
-        self.defense_config = Config(
-            config_type=ConfigType.DEFENSE,
-            parameters=Parameters(defense_parameters)
-        )
+    def _load_config(self, config_type: ConfigType) -> Config:
+        """
+        Build a per-module configuration from its section of the default config.
 
-    def _load_gui_config(self, default_config: Config) -> None:
-        gui_parameters : Dict[str, Any] = default_config.parameters["gui"] if "gui" in default_config.parameters else {}
-        if not gui_parameters:
-            raise ValueError("GUI configuration is missing in the default config.")
+        Args:
+            config_type: The type of configuration to build.
 
-        self.gui_config = Config(
-            config_type=ConfigType.GUI,
-            parameters=Parameters(gui_parameters)
-        )
+        Returns:
+            Config: The configuration, sharing its parameters with the default config.
 
-    def _load_custom_configs(self, default_config: Config) -> None:
-        custom_parameters : Dict[str, Any] = default_config.parameters["custom"] if "custom" in default_config.parameters else {}
-        if not custom_parameters:
-            print_debug("No custom configurations found, using empty config.")
-            custom_parameters = {}
+        Raises:
+            ValueError: If a required section is missing or empty.
+        """
+        key, label = _CONFIG_SECTIONS[config_type]
+        parameters: Dict[str, Any] = self._default_config.parameters[key] if key in self._default_config.parameters else {}
+        if not parameters:
+            if label is not None:
+                # Only reachable if the section was removed after loading
+                raise ValueError(f"{label} configuration is missing in the default config.")
+            if config_type is ConfigType.DEFENSE:
+                print_warning("No defense implementation for now: Defense configuration is missing in the default config.")
+            else:
+                print_debug("No custom configurations found, using empty config.")
+            parameters = {}
 
-        self.custom_configs = Config(
-            config_type=ConfigType.CUSTOM,
-            parameters=Parameters(custom_parameters)
+        return Config(
+            config_type=config_type,
+            parameters=Parameters.view(parameters)
         )
 
     def reload_configs(self) -> None:
@@ -297,18 +316,17 @@ class ConfigManager:
         Returns:
             Config: Loaded configuration
         """
-        if not config_path.exists():
-            raise FileNotFoundError(f"Config file not found: {config_path}")
-
-        with open(config_path, "r") as f:
-            yaml_content: Dict[str, Any] = yaml.safe_load(f)
+        try:
+            yaml_content: Dict[str, Any] = _load_yaml_file(config_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Config file not found: {config_path}") from None
 
         if not yaml_content or "app" not in yaml_content:
             raise ValueError("Invalid configuration file.")
 
         new_default_config = Config(
             config_type=ConfigType.DEFAULT,
-            parameters=Parameters(yaml_content)
+            parameters=Parameters.with_sections(yaml_content)
         )
 
         # Reload all configurations based on the new default config
@@ -323,15 +341,7 @@ class ConfigManager:
         Returns:
             Dict[ConfigType, Config]: Dictionary of all configurations
         """
-        return {
-            ConfigType.APP: self.app_config,
-            ConfigType.ATTACK: self.attack_config,
-            ConfigType.LAB: self.lab_config,
-            ConfigType.METRICS: self.metrics_config,
-            ConfigType.DEFENSE: self.defense_config,
-            ConfigType.GUI: self.gui_config,
-            ConfigType.CUSTOM: self.custom_configs
-        }
+        return {config_type: getattr(self, name) for config_type, name in _CONFIG_ATTRS.items()}
 
 
     def get_config(self, config_type: ConfigType) -> Config:
@@ -345,25 +355,12 @@ class ConfigManager:
             Config: The requested configuration
         """
 
-        match config_type:
-            case ConfigType.APP:
-                return self.app_config
-            case ConfigType.ATTACK:
-                return self.attack_config
-            case ConfigType.LAB:
-                return self.lab_config
-            case ConfigType.METRICS:
-                return self.metrics_config
-            case ConfigType.DEFENSE:
-                return self.defense_config
-            case ConfigType.GUI:
-                return self.gui_config
-            case ConfigType.CUSTOM:
-                return self.custom_configs
-            case ConfigType.DEFAULT:
-                return Config(
-                    config_type=ConfigType.DEFAULT,
-                    parameters=self._load_default_config_file().parameters
-                )
-            case _:
-                raise ValueError(f"Unknown configuration type: {config_type}")
+        name = _CONFIG_ATTRS.get(config_type)
+        if name is not None:
+            return getattr(self, name)
+        if config_type is ConfigType.DEFAULT:
+            return Config(
+                config_type=ConfigType.DEFAULT,
+                parameters=self._load_default_config_file().parameters
+            )
+        raise ValueError(f"Unknown configuration type: {config_type}")
@@ -3,11 +3,30 @@ import sys
 import shutil
 import shlex
 import subprocess
-import threading
+import warnings
 
+from functools import lru_cache
 from typing import List, Optional, Dict, Sequence
 from utils.core.console_window import ConsoleWindow
-from utils.core.logs import print_debug, print_in_dev, print_warning
+from utils.core.logs import is_debug_enabled, print_debug, print_in_dev, print_warning
+
+# Interpreter used by run_python(), resolved once: it cannot change while we run
+_PY_INTERP = sys.executable or shutil.which("python3") or "python3"
+
+@lru_cache(maxsize=None)
+def _sudo_path() -> Optional[str]:
+    """Location of sudo on PATH, looked up once per process."""
+    return shutil.which("sudo")
+
+def _which(program: str, env: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """Location of a program on the PATH the child would search."""
+    # Same search path subprocess uses: env's PATH when given, else ours
+    return _which_on_path(program, os.pathsep.join(os.get_exec_path(env)))
+
+@lru_cache(maxsize=64)
+def _which_on_path(program: str, path: str) -> Optional[str]:
+    """Cached implementation of _which, keyed on PATH."""
+    return shutil.which(program, path=path)
 
 def _prefix_sudo_argv(argv: List[str],
                     want_sudo: bool,
@@ -16,7 +35,7 @@ def _prefix_sudo_argv(argv: List[str],
     """Prefix argv with sudo when requested & available; never double-add."""
     if not want_sudo or os.geteuid() == 0:
         return argv
-    sudo_path = shutil.which("sudo")
+    sudo_path = _sudo_path()
     if not sudo_path:
         print_warning("sudo requested but not available; running without sudo")
         return argv
@@ -38,7 +57,9 @@ def run_command(
     capture_output: bool = True,
     check: bool = True,
     text: bool = True,
-    dry_run: bool = False
+    dry_run: bool = False,
+    discard_output: bool = False,
+    input: Optional[str] = None
 ) -> subprocess.CompletedProcess[str]:
     """
     Run a command as a list of arguments and return a CompletedProcess result.
@@ -54,6 +75,8 @@ def run_command(
         - Environment control: override cwd (working directory) and env (environment variables).
         - Output capture: by default, both stdout and stderr are captured (capture_output=True), and
             the output is decoded to text strings (text=True).
+        - Discarded output: with discard_output=True, stdout and stderr go to /dev/null, with no
+            pipe to read or decode; for commands run only for their exit code.
         - Error handling: if check=True, raise subprocess.CalledProcessError on non-zero exit; otherwise
             return the CompletedProcess object without raising.
 
@@ -68,6 +91,8 @@ def run_command(
         capture_output: If True, capture stdout and stderr into the CompletedProcess object.
         check: If True, raise an exception if the command returns a non-zero exit code.
         text: If True, decode stdout/stderr to str; if False, return bytes.
+        discard_output: If True, send stdout and stderr to /dev/null (capture_output is ignored).
+        input: Optional text written to the command's stdin.
 
     Returns:
         subprocess.CompletedProcess: The result object with attributes args, returncode, stdout
@@ -77,9 +102,7 @@ def run_command(
         subprocess.CalledProcessError: If check=True and the command fails.
         RuntimeError: If want_sudo=True but sudo is requested/required and not available.
     """
-    if env is None:
-        env = dict(os.environ)
-
+    # env=None makes the child inherit this environment without copying it
     final_argv = _prefix_sudo_argv(
         argv,
         want_sudo=want_sudo,
@@ -89,7 +112,25 @@ def run_command(
     if dry_run:
         print_debug("Dry run enabled, not actually executing.")
         raise RuntimeError("Dry run enabled, not actually executing.")
-    print_debug("Executing command: " + " ".join(shlex.quote(a) for a in final_argv))
+    if cwd is None and final_argv and os.sep not in final_argv[0]:
+        # subprocess only uses posix_spawn (no fork of this process) when the
+        # executable is given as a path
+        program = _which(final_argv[0], env)
+        if program is not None:
+            final_argv = [program, *final_argv[1:]]
+    if is_debug_enabled():
+        print_debug("Executing command: %s", shlex.join(final_argv))
+    if discard_output:
+        return subprocess.run(
+            final_argv,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=check,
+            input=input,
+            text=input is not None,
+        )
     return subprocess.run(
         final_argv,
         cwd=cwd,
@@ -97,6 +138,7 @@ def run_command(
         capture_output=capture_output,
         check=check,
         text=text,
+        input=input,
     )
 
 def run_command_str(
@@ -110,12 +152,18 @@ def run_command_str(
     capture_output: bool = True,
     check: bool = True,
     text: bool = True,
-    dry_run: bool = False
+    dry_run: bool = False,
+    discard_output: bool = False
 ) -> subprocess.CompletedProcess[str]:
     """
     Convenience wrapper when you have a simple string command (no pipes, &&, etc.).
     Splits with shlex and calls run_command.
+
+    Deprecated: build the argv list and call run_command directly, which skips
+    the parse and the quoting pitfalls of interpolating values into a string.
     """
+    warnings.warn("run_command_str is deprecated, pass an argv list to run_command",
+                  DeprecationWarning, stacklevel=2)
     argv = shlex.split(command)
     return run_command(
         argv,
@@ -127,7 +175,8 @@ def run_command_str(
         capture_output=capture_output,
         check=check,
         text=text,
-        dry_run=dry_run
+        dry_run=dry_run,
+        discard_output=discard_output
     )
 
 def run_process(argv: List[str],
@@ -157,9 +206,6 @@ def run_process(argv: List[str],
         subprocess.Popen: the child process (you still keep full control from main)
     """
 
-    if env is None:
-        env = dict(os.environ)
-
     # Build final argv (handle sudo once, centrally)
     final_argv = _prefix_sudo_argv(
         argv,
@@ -197,12 +243,12 @@ def run_process(argv: List[str],
             auto_close=auto_close,
             start_new_session=True
         )
-        # Start the window in a separate thread so it doesn't block
-        def run_window():
-            win.create_tk_console()
-        
-        window_thread = threading.Thread(target=run_window, daemon=True)
-        window_thread.start()
+        # Shown by the shared console thread so it doesn't block
+        try:
+            win.show_in_background()
+        except RuntimeError as e:
+            # The process keeps running without its window
+            print_warning(f"Could not open console window: {e}")
         
         # Return the process from the ConsoleWindow
         proc = win.process or win.io.proc
@@ -211,7 +257,7 @@ def run_process(argv: List[str],
         return proc
 
     # Normal, non-windowed process
-    print_debug(f"Running: {final_argv}")
+    print_debug("Running: %s", final_argv)
     if dry_run:
         print_debug("Dry run enabled, not actually executing.")
         raise RuntimeError("Dry run enabled, not actually executing.")
@@ -239,11 +285,10 @@ def run_python(*,
     `args` is a sequence of extra arguments for the target.
     """
 
-    py = sys.executable or shutil.which("python3") or "python3"
     if module is not None:
-        argv = [py, "-m", module, *map(str, args)]
+        argv = [_PY_INTERP, "-m", module, *map(str, args)]
     elif script is not None:
-        argv = [py, script, *map(str, args)]
+        argv = [_PY_INTERP, script, *map(str, args)]
     else:
         raise ValueError("Specify exactly one of `module` or `script`.")
 
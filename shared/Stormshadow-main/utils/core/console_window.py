@@ -4,6 +4,10 @@ from subprocess import Popen
 from typing import Optional, Sequence, Dict, Union
 import os
 import platform
+import queue
+import re
+import socket
+import threading
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 
@@ -13,6 +17,37 @@ TkWidget = Union[tk.Widget, tk.Tk, tk.Frame]
 # Terminal backend interface + helpers
 from utils.core.tty_terminal import TerminalIO, PipeTerminal, create_terminal
 
+# Matches all ANSI CSI escape sequences (colors are the ones ending with 'm')
+_ANSI_RE = re.compile(r'\x1b\[([0-9;]*)?([a-zA-Z])')
+
+# ANSI color mapping to tkinter colors (matching our logging colors)
+_ANSI_COLORS = {
+    '91': '#ff6b6b',  # bright red (for errors)
+    '92': '#51fa7a',  # bright green (for success)
+    '93': '#f1c40f',  # bright yellow (for warnings)
+    '94': '#74b9ff',  # bright blue (for info)
+    '95': '#fd79a8',  # bright magenta (for debug)
+    '96': '#81ecec',  # bright cyan
+    '97': '#ffffff',  # bright white
+    # Standard colors
+    '31': '#ff0000',  # red
+    '32': '#00ff00',  # green
+    '33': '#ffff00',  # yellow
+    '34': '#0000ff',  # blue
+    '35': '#ff00ff',  # magenta
+    '36': '#00ffff',  # cyan
+    '37': '#ffffff',  # white
+}
+
+# Most output bytes appended per widget update; the rest waits for the next one
+_MAX_READ_PER_UPDATE = 256 * 1024
+
+# Control characters dropped from console output (all but \n, \t and \x1B for ANSI, including \r)
+_CONTROL_CHARS = '\x00\x01\x02\x03\x04\x05\x06\x07\x08\x0B\x0C\x0D\x0E\x0F\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1A\x1C\x1D\x1E\x1F\x7F'
+_CONTROL_CHARS_TABLE = str.maketrans('', '', _CONTROL_CHARS)
+# Spaces and tabs at the end of each line
+_TRAILING_WS_RE = re.compile(r'[ \t]+(?=\n|\Z)')
+
 
 class ConsoleWindow:
     """
@@ -35,6 +70,7 @@ class ConsoleWindow:
         auto_close: bool = True,
         is_detached: bool = True,
         parent: Optional[TkWidget] = None,
+        scrollback_lines: int = 10_000,
     ) -> None:
         # Enforce EXACTLY one of process / io
         if (process is None) == (io is None):
@@ -53,11 +89,25 @@ class ConsoleWindow:
         self.auto_close = auto_close
         self.is_detached = is_detached
         self.parent = parent
+        # Oldest lines are dropped beyond this many
+        self.scrollback_lines = scrollback_lines
 
-        self.root: Optional[tk.Tk] = None
+        self.root: Optional[Union[tk.Tk, tk.Toplevel]] = None
         self.frame: Optional[tk.Frame] = None  # For embedded mode
         self.text_area: Optional[scrolledtext.ScrolledText] = None
         self.entry: Optional[ttk.Entry] = None
+        # Style tags already configured on text_area
+        self._configured_tags: set[str] = set()
+        # Output fd watched by a Tk file handler, when the backend has one
+        self._output_fd: Optional[int] = None
+        # Whether the last read stopped at _MAX_READ_PER_UPDATE with output left
+        self._output_capped = False
+        # Pending after_idle() call finishing a capped read, if any
+        self._drain_id: Optional[str] = None
+        # Consecutive polls that found no output (when polling instead)
+        self._idle_pumps = 0
+        # pidfd of the process, watched by a Tk file handler to catch its exit
+        self._exit_fd: Optional[int] = None
 
     # Optional: a spawner helper that *externally* decides PTY vs pipes
     @classmethod
@@ -74,6 +124,7 @@ class ConsoleWindow:
         start_new_session: bool = True,
         is_detached: bool = True,
         parent: Optional[TkWidget] = None,
+        scrollback_lines: int = 10_000,
     ) -> "ConsoleWindow":
         io = create_terminal(
             argv,
@@ -83,7 +134,7 @@ class ConsoleWindow:
             start_new_session=start_new_session,
         )
         return cls(io=io, title=title, interactive=interactive, auto_close=auto_close, 
-                  is_detached=is_detached, parent=parent)
+                  is_detached=is_detached, parent=parent, scrollback_lines=scrollback_lines)
 
     # --- Public -------------------------------------------------------------
 
@@ -103,10 +154,34 @@ class ConsoleWindow:
         
         self._create_console_widgets(self.root)
         
-        self._pump_output()
-        self._watch_process()
+        self._start_output()
+        self._start_watch()
         self.root.mainloop()
 
+    def show_in_background(self) -> None:
+        """
+        Show a detached console without blocking the caller.
+
+        The window is a Toplevel of the Tk interpreter shared by all background
+        consoles, so opening more of them does not start more interpreters or threads.
+
+        Raises:
+            RuntimeError: If the shared Tk interpreter cannot be started.
+        """
+        _ConsoleHost.get().open(self)
+
+    def _create_hosted_console(self, master: tk.Tk) -> None:
+        """Create a detached console as a Toplevel of the shared console host root."""
+        self.root = tk.Toplevel(master)
+        self.root.title(self.title)
+        self.root.geometry("920x540")
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        self._create_console_widgets(self.root)
+
+        self._start_output()
+        self._start_watch()
+
     def _create_embedded_console(self) -> tk.Frame:
         """Create an embedded console within a parent widget. Returns the frame."""
         if not self.parent:
@@ -117,8 +192,8 @@ class ConsoleWindow:
         
         self._create_console_widgets(self.frame)
         
-        self._pump_output()
-        self._watch_process()
+        self._start_output()
+        self._start_watch()
         
         return self.frame
 
@@ -188,6 +263,8 @@ class ConsoleWindow:
 
     def destroy(self) -> None:
         """Destroy the console window/frame."""
+        self._stop_output()
+        self._stop_watch()
         try:
             self.io.close()
         except Exception:
@@ -219,132 +296,98 @@ class ConsoleWindow:
 
     def _append(self, s: str) -> None:
         if self.text_area:
-            # Parse ANSI colors and apply as text tags
-            self._append_with_colors(s)
-            self.text_area.see("end")
-
-    def _append_with_colors(self, text: str) -> None:
-        """Append text with ANSI color codes converted to tkinter text tags."""
+            # Parse ANSI colors and apply as text tags; output made only of
+            # escape sequences changes nothing, so skip the rest
+            if self._append_with_colors(s):
+                self._trim_scrollback()
+                self.text_area.see("end")
+
+    def _trim_scrollback(self) -> None:
+        """Delete the oldest lines beyond scrollback_lines."""
         if not self.text_area:
             return
-            
-        # ANSI color mapping to tkinter colors (matching our logging colors)
-        ansi_colors = {
-            '91': '#ff6b6b',  # bright red (for errors)
-            '92': '#51fa7a',  # bright green (for success)
-            '93': '#f1c40f',  # bright yellow (for warnings)
-            '94': '#74b9ff',  # bright blue (for info)
-            '95': '#fd79a8',  # bright magenta (for debug)
-            '96': '#81ecec',  # bright cyan
-            '97': '#ffffff',  # bright white
-            # Standard colors
-            '31': '#ff0000',  # red
-            '32': '#00ff00',  # green
-            '33': '#ffff00',  # yellow
-            '34': '#0000ff',  # blue
-            '35': '#ff00ff',  # magenta
-            '36': '#00ffff',  # cyan
-            '37': '#ffffff',  # white
-        }
-        
-        import re
-        
-        # More comprehensive ANSI pattern that matches all escape sequences
-        ansi_pattern = re.compile(r'\x1b\[([0-9;]*)?([a-zA-Z])')
-        
+        lines = int(self.text_area.index("end-1c").split(".")[0])
+        overflow = lines - self.scrollback_lines
+        if overflow > 0:
+            self.text_area.delete("1.0", f"{overflow + 1}.0")
+
+    def _append_with_colors(self, text: str) -> bool:
+        """
+        Append text with ANSI color codes converted to tkinter text tags.
+
+        Returns:
+            bool: True if any text was inserted.
+        """
+        if not self.text_area:
+            return False
+
+        # Plain text: no escape sequences to parse, and no style to apply
+        if "\x1b" not in text:
+            if not text:
+                return False
+            self.text_area.insert("end", text)
+            return True
+
         current_color = None
         current_bold = False
         position = 0
-        
-        for match in ansi_pattern.finditer(text):
+        # Text.insert takes (chars, tags, chars, tags, ...), so the whole text
+        # goes in with a single call
+        insert_args: list[Union[str, tuple[str, ...]]] = []
+
+        def add_run(run: str) -> None:
+            if not run:
+                return
+            if current_color or current_bold:
+                insert_args.extend((run, (self._ensure_tag(current_color, current_bold),)))
+            else:
+                insert_args.extend((run, ()))
+
+        for match in _ANSI_RE.finditer(text):
             # Add text before this ANSI sequence
-            if match.start() > position:
-                plain_text = text[position:match.start()]
-                if plain_text:
-                    start_pos = self.text_area.index("end-1c")
-                    self.text_area.insert("end", plain_text)
-                    
-                    # Apply current formatting
-                    if current_color or current_bold:
-                        end_pos = self.text_area.index("end-1c")
-                        tag_name = f"style_{hash((current_color, current_bold)) % 1000}"
-                        
-                        if current_color and current_bold:
-                            self.text_area.tag_configure(tag_name, 
-                                                       foreground=current_color,
-                                                       font=("Fira Mono", 11, "bold"))
-                        elif current_color:
-                            self.text_area.tag_configure(tag_name, 
-                                                       foreground=current_color,
-                                                       font=("Fira Mono", 11))
-                        elif current_bold:
-                            self.text_area.tag_configure(tag_name, 
-                                                       font=("Fira Mono", 11, "bold"))
-                        
-                        self.text_area.tag_add(tag_name, start_pos, end_pos)
-            
+            add_run(text[position:match.start()])
+
             # Process ANSI sequence (only color sequences ending with 'm')
             if match.group(2) == 'm':
                 codes_str = match.group(1) or '0'
                 codes = codes_str.split(';') if codes_str else ['0']
-                
+
                 for code in codes:
                     if code == '0' or code == '':  # Reset
                         current_color = None
                         current_bold = False
                     elif code == '1':  # Bold
                         current_bold = True
-                    elif code in ansi_colors:  # Color
-                        current_color = ansi_colors[code]
-            
+                    elif code in _ANSI_COLORS:  # Color
+                        current_color = _ANSI_COLORS[code]
+
             position = match.end()
-        
+
         # Add remaining text after last ANSI sequence
-        if position < len(text):
-            remaining_text = text[position:]
-            if remaining_text:
-                start_pos = self.text_area.index("end-1c")
-                self.text_area.insert("end", remaining_text)
-                
-                # Apply current formatting
-                if current_color or current_bold:
-                    end_pos = self.text_area.index("end-1c")
-                    tag_name = f"style_{hash((current_color, current_bold)) % 1000}"
-                    
-                    if current_color and current_bold:
-                        self.text_area.tag_configure(tag_name, 
-                                                   foreground=current_color,
-                                                   font=("Fira Mono", 11, "bold"))
-                    elif current_color:
-                        self.text_area.tag_configure(tag_name, 
-                                                   foreground=current_color,
-                                                   font=("Fira Mono", 11))
-                    elif current_bold:
-                        self.text_area.tag_configure(tag_name, 
-                                                   font=("Fira Mono", 11, "bold"))
-                    
-                    self.text_area.tag_add(tag_name, start_pos, end_pos)
+        add_run(text[position:])
+
+        if not insert_args:
+            return False
+        self.text_area.insert("end", *insert_args)
+        return True
+
+    def _ensure_tag(self, color: Optional[str], bold: bool) -> str:
+        """Return the text tag for a (color, bold) style, configuring it on first use."""
+        tag_name = f"s_{color or 'n'}_{int(bold)}"
+        if tag_name not in self._configured_tags and self.text_area:
+            font = ("Fira Mono", 11, "bold") if bold else ("Fira Mono", 11)
+            if color:
+                self.text_area.tag_configure(tag_name, foreground=color, font=font)
+            else:
+                self.text_area.tag_configure(tag_name, font=font)
+            self._configured_tags.add(tag_name)
+        return tag_name
 
     def _sanitize_text(self, text: str) -> str:
         """Remove unwanted control characters but preserve ANSI color sequences."""
         # Don't remove any ANSI sequences here - let _append_with_colors handle them
-        # Only remove other control characters
-        
-        # Clean up lines by removing unwanted characters at beginning and end only
-        lines = text.split('\n')
-        cleaned_lines: list[str] = []
-        
-        # Define unwanted control characters to strip (excluding \n, \t, \x1B for ANSI, but including \r)
-        control_chars = '\x00\x01\x02\x03\x04\x05\x06\x07\x08\x0B\x0C\x0D\x0E\x0F\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1A\x1C\x1D\x1E\x1F\x7F'
-        
-        for line in lines:
-            # Strip unwanted control characters from beginning and end of each line
-            cleaned_line = line.strip(control_chars)
-            # Also strip regular whitespace to clean up any extra spaces/tabs at line ends
-            cleaned_line = cleaned_line.rstrip()
-            cleaned_lines.append(cleaned_line)
-        
-        return '\n'.join(cleaned_lines)
+        # Only remove other control characters, then whitespace at line ends
+        return _TRAILING_WS_RE.sub("", text.translate(_CONTROL_CHARS_TABLE))
 
     def _copy_text(self) -> None:
         """Copy selected text or all text to clipboard."""
@@ -365,38 +408,121 @@ class ConsoleWindow:
             self.root.clipboard_append(selected_text)
             self.root.update()  # Ensure clipboard is updated
 
+    def _start_output(self) -> None:
+        """Copy output as it arrives: on fd readiness when possible, by polling otherwise."""
+        widget = self.root if self.is_detached else self.frame
+        fd = self.io.fileno()
+        # PTY master or pipe backend wakeup fd; Tk has no file handlers on Windows
+        if widget is None or fd is None or not hasattr(widget.tk, "createfilehandler"):
+            self._pump_output()
+            return
+        self._output_fd = fd
+        widget.tk.createfilehandler(fd, tk.READABLE, self._on_output_ready)
+
+    def _on_output_ready(self, _fd: int, _mask: int) -> None:
+        if self._read_output():
+            # The pipe backend drains all its wakeups at once, so output left
+            # behind by the cap would not make the fd readable again
+            if self._output_capped and self._drain_id is None:
+                widget = self.root if self.is_detached else self.frame
+                if widget is not None:
+                    self._drain_id = widget.after_idle(self._drain_output)
+        # Once the output is exhausted the fd stays readable: stop watching it
+        elif self.io.at_eof():
+            self._stop_output()
+
+    def _drain_output(self) -> None:
+        """Continue a read cut short by _MAX_READ_PER_UPDATE."""
+        self._drain_id = None
+        if self._output_fd is not None:
+            self._on_output_ready(self._output_fd, tk.READABLE)
+
+    def _stop_output(self) -> None:
+        """Unregister the output file handler, if any."""
+        if self._output_fd is None:
+            return
+        widget = self.root if self.is_detached else self.frame
+        if widget is not None:
+            widget.tk.deletefilehandler(self._output_fd)
+            if self._drain_id is not None:
+                widget.after_cancel(self._drain_id)
+        self._drain_id = None
+        self._output_fd = None
+
     def _pump_output(self) -> None:
-        while True:
-            chunk = self.io.read_nowait()
-            if not chunk:
-                break
-            try:
-                text = chunk.decode("utf-8", "replace")
-            except Exception:
-                text = chunk.decode("latin-1", "replace")
-            
-            # Sanitize the text before appending (keeps ANSI colors)
-            sanitized_text = self._sanitize_text(text)
-            self._append(sanitized_text)
-        
+        # Poll quickly while output flows, backing off towards 230 ms when idle
+        if self._read_output():
+            self._idle_pumps = 0
+            delay = 15
+        else:
+            self._idle_pumps = min(self._idle_pumps + 1, 10)
+            delay = 30 + self._idle_pumps * 20
+
         # Schedule next pump for both detached and embedded modes
         widget = self.root if self.is_detached else self.frame
         if widget:
-            widget.after(30, self._pump_output)
+            widget.after(delay, self._pump_output)
+
+    def _read_output(self) -> bool:
+        """Append all currently available output. Returns True if any was read."""
+        # Gather pending chunks first so the widget is updated once, capped so
+        # a flood of output can't stall the event loop
+        buf = bytearray()
+        while len(buf) < _MAX_READ_PER_UPDATE and (chunk := self.io.read_nowait()):
+            buf += chunk
+        self._output_capped = len(buf) >= _MAX_READ_PER_UPDATE
+        if not buf:
+            return False
+        try:
+            text = buf.decode("utf-8", "replace")
+        except Exception:
+            text = buf.decode("latin-1", "replace")
 
-    def _watch_process(self) -> None:
+        # Sanitize the text before appending (keeps ANSI colors)
+        sanitized_text = self._sanitize_text(text)
+        if sanitized_text:
+            self._append(sanitized_text)
+        return True
+
+    def _start_watch(self) -> None:
+        """Act on process exit: wait on a pidfd where available (Linux), poll otherwise."""
         proc = self.process or self.io.proc
-        exited = (proc is not None and proc.poll() is not None)
-        if exited and self.auto_close:
+        widget = self.root if self.is_detached else self.frame
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if (proc is not None and widget is not None and pidfd_open is not None
+                and hasattr(widget.tk, "createfilehandler")):
             try:
-                self.io.close()
-            except Exception:
-                pass
-            if self.is_detached and self.root:
-                self.root.after(50, self.root.destroy)
-            elif not self.is_detached and self.frame:
-                # For embedded mode, just stop pumping but don't destroy
-                pass
+                self._exit_fd = pidfd_open(proc.pid)
+            except OSError:
+                # Already reaped, or no pidfd support in this kernel
+                self._exit_fd = None
+            if self._exit_fd is not None:
+                widget.tk.createfilehandler(self._exit_fd, tk.READABLE, self._on_process_exit)
+                return
+        self._watch_process()
+
+    def _on_process_exit(self, _fd: int, _mask: int) -> None:
+        self._stop_watch()
+        # Reap the child, as polling did
+        proc = self.process or self.io.proc
+        if proc is not None:
+            proc.poll()
+        self._on_exit()
+
+    def _stop_watch(self) -> None:
+        """Unregister and close the process exit pidfd, if any."""
+        if self._exit_fd is None:
+            return
+        widget = self.root if self.is_detached else self.frame
+        if widget is not None:
+            widget.tk.deletefilehandler(self._exit_fd)
+        os.close(self._exit_fd)
+        self._exit_fd = None
+
+    def _watch_process(self) -> None:
+        proc = self.process or self.io.proc
+        if proc is not None and proc.poll() is not None:
+            self._on_exit()
             return
         
         # Schedule next watch for both detached and embedded modes
@@ -404,6 +530,23 @@ class ConsoleWindow:
         if widget:
             widget.after(200, self._watch_process)
 
+    def _on_exit(self) -> None:
+        """Handle the process exit: close the console if auto_close is set."""
+        if not self.auto_close:
+            return
+        # Show the output written just before exiting
+        self._read_output()
+        self._stop_output()
+        try:
+            self.io.close()
+        except Exception:
+            pass
+        if self.is_detached and self.root:
+            self.root.after(50, self.root.destroy)
+        elif not self.is_detached and self.frame:
+            # For embedded mode, just stop pumping but don't destroy
+            pass
+
     def _on_close(self) -> None:
         """Handle window close - only for detached mode."""
         if self.is_detached:
@@ -464,3 +607,73 @@ class ConsoleWindow:
                 os.kill(proc.pid, sig)
         except Exception:
             pass
+
+
+class _ConsoleHost:
+    """
+    Hidden Tk root, run by one daemon thread, hosting the background consoles.
+
+    Consoles are handed over through a queue; a socketpair watched by Tk wakes
+    the host thread up, since Tk calls must stay on the thread owning the root.
+    """
+
+    _instance: Optional["_ConsoleHost"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._pending: "queue.SimpleQueue[ConsoleWindow]" = queue.SimpleQueue()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="console-host", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise RuntimeError(f"Cannot start the console window host: {self._error}") from self._error
+
+    @classmethod
+    def get(cls) -> "_ConsoleHost":
+        """Return the console host, starting it on first use."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def open(self, console: ConsoleWindow) -> None:
+        """Queue a console to be shown by the host thread."""
+        self._pending.put(console)
+        try:
+            self._wake_w.send(b"\0")
+        except BlockingIOError:
+            pass  # Socket buffer full: a wakeup is already pending
+
+    def _run(self) -> None:
+        try:
+            self._root = tk.Tk()
+            self._root.withdraw()
+            self._root.tk.createfilehandler(self._wake_r, tk.READABLE, self._open_pending)
+        except Exception as e:  # e.g. no display available
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        self._root.mainloop()
+
+    def _open_pending(self, _fd: object = None, _mask: int = 0) -> None:
+        # Clear the wakeup before draining so a console queued meanwhile re-arms it
+        try:
+            self._wake_r.recv(4096)
+        except BlockingIOError:
+            pass
+        while True:
+            try:
+                console = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                console._create_hosted_console(self._root)
+            except Exception:
+                # A broken console must not stop the host from serving others
+                console.io.close()
@@ -2,7 +2,9 @@
 
 import logging
 import os
+import re
 import sys
+from functools import lru_cache
 from typing import Any, Optional
 
 
@@ -41,6 +43,12 @@ def _supports_color(stream: Any) -> bool:
     )
 
 
+@lru_cache(maxsize=1)
+def _stdout_supports_color() -> bool:
+    """_supports_color(sys.stdout), checked once: the terminal and environment don't change."""
+    return _supports_color(sys.stdout)
+
+
 # ---------- Custom levels ----------
 SUCCESS_LEVEL = 25
 DEV_LEVEL = 15
@@ -68,6 +76,10 @@ logging.setLoggerClass(StormLogger)
 
 
 # ---------- Formatter with color & emoji ----------
+_NO_AFFIXES = (" ", "")
+# ANSI color sequences, removed from messages when colors are off
+_ANSI_SGR_RE = re.compile(r'\x1b\[[0-9;]*m')
+
 class StormFormatter(logging.Formatter):
     EMOJI = {
         "DEBUG": "🐛",
@@ -92,26 +104,32 @@ class StormFormatter(logging.Formatter):
         super().__init__(fmt="%(message)s")
         # Never use color in file output
         self.use_color = use_color and not for_file
+        # Text around the message for each level: color + emoji, and color reset
+        self._affixes: dict[str, tuple[str, str]] = {}
+        for levelname, emoji in self.EMOJI.items():
+            color = self.COLOR.get(levelname, "") if self.use_color else ""
+            self._affixes[levelname] = (f"{color}{emoji} ", Colors.END if color else "")
+        # Same for the header style used by print_in_dev
+        dev_color = self.COLOR["DEV"] if self.use_color else ""
+        self._dev_block_affixes = (
+            f"{dev_color}== IN DEV ==\n⚠ ",
+            "\n" + "=" * 30 + (Colors.END if dev_color else ""),
+        )
 
     def format(self, record: logging.LogRecord) -> str:
-        # Prefix with emoji + message
         levelname = record.levelname
-        emoji = self.EMOJI.get(levelname, "")
-        base = f"{emoji} {record.getMessage()}"
 
         # Optional header style used by print_in_dev
-        if levelname == "DEV" and "IN_DEV_BLOCK" in record.__dict__ and record.__dict__["IN_DEV_BLOCK"]:
-            base = f"== IN DEV ==\n⚠ {record.getMessage()}\n" + "=" * 30
-
-        # Apply colors if supported and enabled
-        if self.use_color:
-            color = self.COLOR.get(levelname, "")
-            if color:
-                # Make sure we're properly embedding the color codes
-                return f"{color}{base}{Colors.END}"
-        
-        # No color formatting
-        return base
+        if levelname == "DEV" and record.__dict__.get("IN_DEV_BLOCK"):
+            prefix, suffix = self._dev_block_affixes
+        else:
+            # Levels we don't know get neither color nor emoji
+            prefix, suffix = self._affixes.get(levelname, _NO_AFFIXES)
+        message = record.getMessage()
+        # Messages may carry their own colors (print_header), e.g. into a log file
+        if not self.use_color and "\x1b" in message:
+            message = _ANSI_SGR_RE.sub("", message)
+        return prefix + message + suffix
 
 
 # ---------- Setup ----------
@@ -214,39 +232,54 @@ def get_logger() -> StormLogger:
     """Get the configured StormLogger instance."""
     return _logger
 
+def is_debug_enabled() -> bool:
+    """Return True if DEBUG messages are currently emitted."""
+    return _logger.isEnabledFor(logging.DEBUG)
+
 def use_log_file(path: str) -> None:
     """Enable logging to a file."""
     setup_logging(logfile=path)
 
 # ---------- Replacement functions for printing.py ----------
-def print_success(message: Any, **kwargs: Any) -> None:
-    """Print a success message (replaces printing.print_success)."""
-    _logger.success(str(message))
+def print_success(message: Any, *args: Any, **kwargs: Any) -> None:
+    """Print a success message (replaces printing.print_success).
+
+    Extra positional args are %-formatted into message only if it is emitted;
+    the same applies to the other print_* helpers below.
+    """
+    if _logger.isEnabledFor(SUCCESS_LEVEL):
+        _logger.success(str(message), *args)
 
-def print_error(message: Any, **kwargs: Any) -> None:
+def print_error(message: Any, *args: Any, **kwargs: Any) -> None:
     """Print an error message (replaces printing.print_error)."""
-    _logger.error(str(message))
+    if _logger.isEnabledFor(logging.ERROR):
+        _logger.error(str(message), *args)
 
-def print_warning(message: Any, **kwargs: Any) -> None:
+def print_warning(message: Any, *args: Any, **kwargs: Any) -> None:
     """Print a warning message (replaces printing.print_warning)."""
-    _logger.warning(str(message))
+    if _logger.isEnabledFor(logging.WARNING):
+        _logger.warning(str(message), *args)
 
-def print_info(message: Any, **kwargs: Any) -> None:
+def print_info(message: Any, *args: Any, **kwargs: Any) -> None:
     """Print an info message (replaces printing.print_info)."""
-    _logger.info(str(message))
+    if _logger.isEnabledFor(logging.INFO):
+        _logger.info(str(message), *args)
 
-def print_debug(message: Any, **kwargs: Any) -> None:
+def print_debug(message: Any, *args: Any, **kwargs: Any) -> None:
     """Print a debug message (replaces printing.print_debug)."""
-    _logger.debug(str(message))
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(str(message), *args)
 
-def print_in_dev(message: Any, **kwargs: Any) -> None:
+def print_in_dev(message: Any, *args: Any, **kwargs: Any) -> None:
     """Print a development message (replaces printing.print_in_dev)."""
-    _logger.dev(str(message), extra={"IN_DEV_BLOCK": True})
+    if _logger.isEnabledFor(DEV_LEVEL):
+        _logger.dev(str(message), *args, extra={"IN_DEV_BLOCK": True})
 
 def print_header(message: Any, **kwargs: Any) -> None:
     """Print a header message (replaces printing.print_header)."""
     # Treat as info but bold cyan like before
-    _logger.info(f"{Colors.BOLD}{Colors.CYAN}{message}{Colors.END}" if _supports_color(sys.stdout) else str(message))
+    if _logger.isEnabledFor(logging.INFO):
+        _logger.info(f"{Colors.BOLD}{Colors.CYAN}{message}{Colors.END}" if _stdout_supports_color() else str(message))
 
 def print_separator(char: str = "=", length: int = 60) -> None:
     """Print a separator line (replaces printing.print_separator)."""
@@ -51,29 +51,29 @@ class StormShadow:
         self.parameters : Parameters = self.configManager.get_config(ConfigType.APP).parameters
         print_debug("App configurations loaded successfully.")
         # If active, a simulation will be run instead of a real attack / lab
-        self.dry_run = self.parameters.get("dry_run", False, path=["enabled"])
+        self.dry_run = self.parameters.get("dry_run", False, path=("enabled",))
 
         if self.dry_run:
             print_warning("Dry run mode is enabled. No real attacks and no features will be executed.")
             print_warning("This is useful for testing configurations without affecting real systems.")
 
         # Configure log file if enabled
-        self.log_file_on = self.parameters.get("log_file", path=["enabled"])  # Enable logging to a file
+        self.log_file_on = self.parameters.get("log_file", path=("enabled",))  # Enable logging to a file
         if self.log_file_on:
-            log_file_path = self.parameters.get("log_file", "stormshadow.log", path=["path"])
+            log_file_path = self.parameters.get("log_file", "stormshadow.log", path=("path",))
             print_debug(f"Enabling log file: {log_file_path}")
             use_log_file(str(log_file_path))
 
-        self.attack_on = self.parameters.get("attack", path=["enabled"]) # Enable attack mode by default
-        self.custom_payload_on = self.parameters.get("custom_payload", path=["enabled"])  # Allow the use of a custom payload for some attacks
-        self.spoofing_on = self.parameters.get("spoofing", path=["enabled"])  # Enable spoofing by default
+        self.attack_on = self.parameters.get("attack", path=("enabled",)) # Enable attack mode by default
+        self.custom_payload_on = self.parameters.get("custom_payload", path=("enabled",))  # Allow the use of a custom payload for some attacks
+        self.spoofing_on = self.parameters.get("spoofing", path=("enabled",))  # Enable spoofing by default
         # Activate lab features
-        self.lab_on = self.parameters.get("lab", path=["enabled"])  # Enable lab mode by default
-        self.defense_on = self.parameters.get("defense", path=["enabled"])  # Enable defense mode by default
-        self.return_path_on = self.parameters.get("return_path", path=["enabled"])  # Enable return path
+        self.lab_on = self.parameters.get("lab", path=("enabled",))  # Enable lab mode by default
+        self.defense_on = self.parameters.get("defense", path=("enabled",))  # Enable defense mode by default
+        self.return_path_on = self.parameters.get("return_path", path=("enabled",))  # Enable return path
 
         # Other features
-        self.metrics_on = self.parameters.get("metrics", path=["enabled"])  # Enable metrics collection by default
+        self.metrics_on = self.parameters.get("metrics", path=("enabled",))  # Enable metrics collection by default
         self.metrics_config : Config = self.configManager.get_config(ConfigType.METRICS)
         self.defense_config : Config = self.configManager.get_config(ConfigType.DEFENSE)
         self.gui_config : Config = self.configManager.get_config(ConfigType.GUI)
@@ -4,7 +4,7 @@ import os
 import threading
 import queue
 import subprocess
-from typing import Optional, Sequence, Dict
+from typing import IO, Optional, Sequence, Dict
 
 # Optional POSIX PTY support
 try:
@@ -14,14 +14,30 @@ except Exception:
     pty = None     # type: ignore
     fcntl = None   # type: ignore
 
+# Bytes requested per read of the child's output; larger reads split bursts
+# into fewer chunks to decode and display
+READ_SIZE = int(os.environ.get("STORMSHADOW_TTY_READ_SIZE", "65536"))
+
 
 class TerminalIO:
-    """Minimal IO backend used by ConsoleWindow."""
+    """
+    Minimal IO backend used by ConsoleWindow.
+
+    read_nowait() should return up to READ_SIZE bytes per call.
+    """
     proc: Optional[subprocess.Popen[bytes]] = None
 
     def read_nowait(self) -> Optional[bytes]:
         raise NotImplementedError
 
+    def fileno(self) -> Optional[int]:
+        """Fd that becomes readable when output arrives, or None if it can only be polled."""
+        return None
+
+    def at_eof(self) -> bool:
+        """True once all of the child's output has been read."""
+        return False
+
     def write(self, data: bytes) -> int:
         raise NotImplementedError
 
@@ -39,8 +55,30 @@ class PipeTerminal(TerminalIO):
         self.proc = proc
         self._q: "queue.Queue[bytes]" = queue.Queue()
         self._closed = False
-        self._t = threading.Thread(target=self._reader, daemon=True)
-        self._t.start()
+        # On POSIX, readers write a byte to this pipe for each chunk queued so
+        # the console can wait on fileno() instead of polling. Each reader
+        # holds its own write end, so the pipe hits EOF once all are done.
+        self._wake_r: Optional[int] = None
+        self._wake_eof = False
+        wake_w: Optional[int] = None
+        if os.name == "posix":
+            self._wake_r, wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            os.set_blocking(wake_w, False)
+        # One reader per stream: reading them in turn would block on an idle
+        # stderr while a full stdout pipe stalls the child
+        self._threads = [
+            threading.Thread(
+                target=self._reader,
+                args=(stream, None if wake_w is None else os.dup(wake_w)),
+                daemon=True,
+            )
+            for stream in (proc.stdout, proc.stderr) if stream is not None
+        ]
+        if wake_w is not None:
+            os.close(wake_w)
+        for t in self._threads:
+            t.start()
 
     @classmethod
     def spawn(
@@ -66,42 +104,51 @@ class PipeTerminal(TerminalIO):
     def wrap_existing(cls, proc: subprocess.Popen[bytes]) -> "PipeTerminal":
         return cls(proc)
 
-    def _reader(self) -> None:
-        assert self.proc is not None
-        streams = [self.proc.stdout, self.proc.stderr]
-        import time
-        while True:
-            if self.proc.poll() is not None:
-                # drain remaining
-                for s in streams:
+    def _reader(self, stream: IO[bytes], wake_w: Optional[int]) -> None:
+        try:
+            # read1 returns what is available instead of waiting for a full
+            # buffer; b"" means the child closed the stream
+            while chunk := stream.read1(READ_SIZE):  # type: ignore[attr-defined]
+                self._q.put(chunk)
+                if wake_w is not None:
                     try:
-                        if s is None:
-                            continue
-                        rem = s.read()
-                        if rem:
-                            self._q.put(rem)
-                    except Exception:
-                        pass
-                break
-            for s in streams:
-                try:
-                    if s is None:
-                        continue
-                    chunk = s.read(4096)
-                    if chunk:
-                        self._q.put(chunk)
-                except Exception:
-                    pass
-            time.sleep(0.02)
+                        os.write(wake_w, b"\0")
+                    except BlockingIOError:
+                        pass  # Pipe full: it is readable already
+        except (OSError, ValueError):
+            pass
+        finally:
+            if wake_w is not None:
+                os.close(wake_w)
 
     def read_nowait(self) -> Optional[bytes]:
         if self._closed:
             return None
+        # Drain wakeups before the queue: EOF here means every chunk is queued
+        if self._wake_r is not None and not self._wake_eof:
+            try:
+                if not os.read(self._wake_r, 4096):
+                    self._wake_eof = True
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._wake_eof = True
         try:
             return self._q.get_nowait()
         except queue.Empty:
             return None
 
+    def fileno(self) -> Optional[int]:
+        return None if self._closed else self._wake_r
+
+    def at_eof(self) -> bool:
+        # Readers only stop after queueing their last chunk
+        if self._wake_r is not None:
+            done = self._wake_eof
+        else:
+            done = not any(t.is_alive() for t in self._threads)
+        return done and self._q.empty()
+
     def write(self, data: bytes) -> int:
         if self._closed or self.proc is None or self.proc.stdin is None:
             return 0
@@ -121,6 +168,9 @@ class PipeTerminal(TerminalIO):
                 self.proc.stdin.close()
         except Exception:
             pass
+        if self._wake_r is not None:
+            os.close(self._wake_r)
+            self._wake_r = None
 
 
 # ------------------------ PTY backend (POSIX) ------------------------
@@ -139,9 +189,8 @@ class PtyTerminal(TerminalIO):
         if os.name != "posix" or pty is None or fcntl is None:
             raise RuntimeError("PTY not available on this platform")
 
-        if env is None:
-            env = dict(os.environ)
-        env = dict(env)
+        # Copied either way, since TERM may be added below
+        env = dict(os.environ if env is None else env)
         env.setdefault("TERM", term)
 
         master_fd, slave_fd = pty.openpty()
@@ -157,6 +206,7 @@ class PtyTerminal(TerminalIO):
 
         self._master_fd = master_fd
         self._closed = False
+        self._eof = False
 
         self.proc = subprocess.Popen(
             argv,
@@ -178,11 +228,23 @@ class PtyTerminal(TerminalIO):
         if self._closed:
             return None
         try:
-            return os.read(self._master_fd, 4096)
+            data = os.read(self._master_fd, READ_SIZE)
         except BlockingIOError:
             return None
         except OSError:
+            # EIO: every process holding the slave side has exited
+            self._eof = True
             return None
+        if not data:
+            self._eof = True
+            return None
+        return data
+
+    def fileno(self) -> Optional[int]:
+        return None if self._closed else self._master_fd
+
+    def at_eof(self) -> bool:
+        return self._eof or self._closed
 
     def write(self, data: bytes) -> int:
         if self._closed:
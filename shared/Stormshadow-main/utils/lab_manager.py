@@ -5,12 +5,33 @@ This module provides centralized lab environment management by managing
 Docker containers and lab infrastructure.
 """
 
+import http.client
+import json
 import os
+import socket
+import threading
 import time
+from urllib.parse import quote
 
 from .core.logs import print_info, print_error, print_debug
 from .config.config import Config
-from utils.core.command_runner import run_command_str, run_process
+from utils.core.command_runner import run_command, run_process
+
+DOCKER_SOCKET = "/var/run/docker.sock"
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP/1.1 keep-alive connection over a Unix socket (the Docker Engine API)."""
+
+    def __init__(self, socket_path: str, timeout: float = 2.0) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
 
 class LabManager:
     """
@@ -46,8 +67,31 @@ class LabManager:
         self.open_window = self.parameters.get("open_window", False)  # Use config setting for window opening
         print_debug(f"Lab manager initialized with parameters: {self.parameters}")
         self.is_running = False  # Track if the lab is currently running
+        # Query the Docker Engine API directly when its socket is usable by this
+        # user; otherwise status() falls back to spawning `sudo docker ps`
+        self._docker_api: _UnixHTTPConnection | None = (
+            _UnixHTTPConnection(DOCKER_SOCKET)
+            if os.access(DOCKER_SOCKET, os.R_OK | os.W_OK) else None
+        )
+        # status() is called from several threads (GUI watchdog, lab worker,
+        # panel executor); http.client connections are not thread-safe
+        self._docker_api_lock = threading.Lock()
         print_info("Lab manager initialized")
 
+    @property
+    def stdout_fd(self) -> int | None:
+        """
+        File descriptor of the container process' stdout pipe.
+
+        Returns:
+            int | None: The fd, or None when no process was started or its
+            output goes to a terminal window instead of a pipe
+        """
+        process = self.container_process
+        if process is None or process.stdout is None:
+            return None
+        return process.stdout.fileno()
+
     def _cleanup_container(self) -> None:
         """
         Clean up any existing Docker container.
@@ -60,8 +104,8 @@ class LabManager:
             print_info("Cleaning up existing containers...")
             
             # Check if container exists by listing all containers and checking names
-            result = run_command_str(
-                f"docker ps -a --format '{{{{.Names}}}}'",
+            result = run_command(
+                ["docker", "ps", "-a", "--format", "{{.Names}}"],
                 check=False,
                 capture_output=True,
                 want_sudo=True
@@ -73,7 +117,7 @@ class LabManager:
             
             if container_exists:
                 print_info(f"Removing existing container '{self.container_name}'...")
-                run_command_str(f"docker rm -f {self.container_name}", want_sudo=True)
+                run_command(["docker", "rm", "-f", self.container_name], want_sudo=True, discard_output=True)
                 print_info("Container cleanup complete")
             else:
                 print_debug(f"Container '{self.container_name}' does not exist or was already removed")
@@ -94,8 +138,8 @@ class LabManager:
             
         try:
             # Check if image exists
-            result = run_command_str(
-                f"sudo docker images -q {self.docker_image}",
+            result = run_command(
+                ["sudo", "docker", "images", "-q", self.docker_image],
                 capture_output=True,
                 check=False
             )
@@ -107,8 +151,8 @@ class LabManager:
             print_info(f"Building Docker image '{self.docker_image}'...")
             dockerfile_path = os.path.join(self.project_root, "sip-lab", "sip_server")
 
-            build_result = run_command_str(
-                f"sudo docker build -t {self.docker_image} .",
+            build_result = run_command(
+                ["sudo", "docker", "build", "-t", self.docker_image, "."],
                 cwd=dockerfile_path,
                 capture_output=False
             )
@@ -255,10 +299,22 @@ class LabManager:
         if self.dry_run:
             print_info("Dry run mode: would check lab status")
             return "Dry run mode"
+
+        with self._docker_api_lock:
+            conn = self._docker_api
+            if conn is not None:
+                try:
+                    status_output = self._status_from_api(conn)
+                    self.is_running = status_output.startswith("Up")
+                    return status_output
+                except (OSError, http.client.HTTPException, ValueError) as e:
+                    print_debug(f"Docker API unavailable, falling back to docker CLI: {e}")
+                    conn.close()
+                    self._docker_api = None
             
         try:
-            result = run_command_str(
-                f"docker ps --filter \"name={self.container_name}\" --format '{{{{.Status}}}}'",
+            result = run_command(
+                ["docker", "ps", "--filter", f"name={self.container_name}", "--format", "{{.Status}}"],
                 check=False,
                 capture_output=True,
                 want_sudo=True
@@ -270,6 +326,22 @@ class LabManager:
             print_error(f"Error checking lab status: {e}")
             return "Unknown"
 
+    def _status_from_api(self, conn: _UnixHTTPConnection) -> str:
+        """
+        Read the container status over the Docker Engine API.
+
+        Returns the same text as `docker ps --format '{{.Status}}'` for the
+        containers matching the lab container name.
+        """
+        filters = quote(json.dumps({"name": [self.container_name]}))
+        conn.request("GET", f"/containers/json?filters={filters}")
+        response = conn.getresponse()
+        body = response.read()
+        if response.status != 200:
+            raise http.client.HTTPException(f"Docker API returned HTTP {response.status}")
+        containers = json.loads(body)
+        return "\n".join(container["Status"] for container in containers)
+
     def restart(self) -> None:
         """
         Restart the lab manager.
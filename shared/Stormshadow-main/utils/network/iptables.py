@@ -1,26 +1,26 @@
 
 import os
+import shlex
 import time
 import uuid
 import subprocess
 from typing import List, Optional, Tuple
 
 from utils.core.logs import print_debug, print_info, print_warning
-from utils.core.command_runner import run_command_str
+from utils.core.command_runner import run_command
 
 def get_current_iptables_queue_num() -> int:
     """
     Get the current number of packets in the iptables queue.
     """
-    # run the iptables list command and filter in Python. Do NOT include a shell pipe
-    # in the command string because run_command_str uses shlex.split + subprocess.run
-    # without a shell. Passing '|' and 'grep' as arguments results in iptables being
-    # invoked with invalid arguments (see CalledProcessError with exit status 2).
+    # run the iptables list command and filter in Python: run_command uses no shell,
+    # so a '|' and 'grep' in argv would be passed to iptables as invalid arguments
+    # (see CalledProcessError with exit status 2).
     # Note: This is a read-only operation, so dry_run is not used
-    command = "iptables -S"
+    command = ["iptables", "-S"]
     try:
         print_debug(f"Running command to check current queue number: {command}")
-        result = run_command_str(command, capture_output=True, check=True, want_sudo=True)
+        result = run_command(command, capture_output=True, check=True, want_sudo=True)
         # Filter for NFQUEUE lines using Python instead of a shell pipeline
         lines = [l for l in result.stdout.strip().split('\n') if 'NFQUEUE' in l]
         if not lines:
@@ -46,10 +46,11 @@ def create_matching_queue(queue_num: int, chain: str, dst_port: int, dry_run: bo
     Returns:
         bool: True if successful, False otherwise.
     """
-    command = f"sudo iptables -I {chain} -p udp --dport {dst_port} -j NFQUEUE --queue-num {queue_num}"
+    command = ["iptables", "-I", chain, "-p", "udp", "--dport", str(dst_port),
+               "-j", "NFQUEUE", "--queue-num", str(queue_num)]
     try:
         print_debug(f"Creating matching queue with command: {command}")
-        run_command_str(command, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
+        run_command(command, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
     except subprocess.CalledProcessError as e:
         print_warning(f"Failed to create matching queue: {e}")
         return False
@@ -191,14 +192,14 @@ def _parse_comment(comment: str) -> Optional[Tuple[str, int, Optional[str], bool
 def _iptables_S(chain: Optional[str] = None, table: Optional[str] = None) -> List[str]:
     """Return iptables -S output lines, optionally for a specific chain and table (default filter).
     This is a read-only operation, so dry_run is not used."""
-    base = "iptables -S"
+    base = ["iptables", "-S"]
     if table:
-        base = f"iptables -t {table} -S"
+        base = ["iptables", "-t", table, "-S"]
     if chain:
-        base = f"{base} {chain}"
+        base.append(chain)
     try:
         print_debug(f"Listing iptables rules: {base}")
-        res = run_command_str(base, capture_output=True, check=True, want_sudo=True)
+        res = run_command(base, capture_output=True, check=True, want_sudo=True)
         return [l for l in res.stdout.splitlines() if l.strip()]
     except subprocess.CalledProcessError as e:
         # Chain may not exist yet, that's OK for cleanup
@@ -223,8 +224,8 @@ def ensure_chain_and_anchor(anchor_chain: str = "INPUT", table: str = "filter",
     """
     # 1) Create chain if missing
     try:
-        run_command_str(
-            f"iptables -t {table} -N {STORMSHADOW_CHAIN}",
+        run_command(
+            ["iptables", "-t", table, "-N", STORMSHADOW_CHAIN],
             capture_output=False,
             check=True,
             want_sudo=True,
@@ -237,9 +238,9 @@ def ensure_chain_and_anchor(anchor_chain: str = "INPUT", table: str = "filter",
 
     # 2) Ensure anchor jump exists (check is read-only, so no dry_run)
     try:
-        run_command_str(
-            f"iptables -t {table} -C {anchor_chain} -j {STORMSHADOW_CHAIN}",
-            capture_output=False,
+        run_command(
+            ["iptables", "-t", table, "-C", anchor_chain, "-j", STORMSHADOW_CHAIN],
+            discard_output=True,
             check=True,
             want_sudo=True,
         )
@@ -248,8 +249,9 @@ def ensure_chain_and_anchor(anchor_chain: str = "INPUT", table: str = "filter",
         # Not present; insert at top for early processing
         comment = _comment_for(suid, extra=f"{anchor_chain}->{STORMSHADOW_CHAIN}", preserve=preserve)
         try:
-            run_command_str(
-                f"iptables -t {table} -I {anchor_chain} 1 -j {STORMSHADOW_CHAIN} -m comment --comment '{comment}'",
+            run_command(
+                ["iptables", "-t", table, "-I", anchor_chain, "1", "-j", STORMSHADOW_CHAIN,
+                 "-m", "comment", "--comment", comment],
                 capture_output=False,
                 check=True,
                 want_sudo=True,
@@ -272,8 +274,8 @@ def ensure_nat_chain_and_anchor(anchor_chain: str = "OUTPUT", suid: str = "ancho
     """
     table = "nat"
     try:
-        run_command_str(
-            f"iptables -t {table} -N {STORMSHADOW_NAT_CHAIN}",
+        run_command(
+            ["iptables", "-t", table, "-N", STORMSHADOW_NAT_CHAIN],
             capture_output=False,
             check=True,
             want_sudo=True,
@@ -285,9 +287,9 @@ def ensure_nat_chain_and_anchor(anchor_chain: str = "OUTPUT", suid: str = "ancho
 
     # Check is read-only, so no dry_run
     try:
-        run_command_str(
-            f"iptables -t {table} -C {anchor_chain} -j {STORMSHADOW_NAT_CHAIN}",
-            capture_output=False,
+        run_command(
+            ["iptables", "-t", table, "-C", anchor_chain, "-j", STORMSHADOW_NAT_CHAIN],
+            discard_output=True,
             check=True,
             want_sudo=True,
         )
@@ -295,8 +297,9 @@ def ensure_nat_chain_and_anchor(anchor_chain: str = "OUTPUT", suid: str = "ancho
     except subprocess.CalledProcessError:
         comment = _comment_for(suid, extra=f"{anchor_chain}->{STORMSHADOW_NAT_CHAIN}", preserve=preserve)
         try:
-            run_command_str(
-                f"iptables -t {table} -I {anchor_chain} 1 -j {STORMSHADOW_NAT_CHAIN} -m comment --comment '{comment}'",
+            run_command(
+                ["iptables", "-t", table, "-I", anchor_chain, "1", "-j", STORMSHADOW_NAT_CHAIN,
+                 "-m", "comment", "--comment", comment],
                 capture_output=False,
                 check=True,
                 want_sudo=True,
@@ -322,36 +325,67 @@ def add_nfqueue_rule_tagged(queue_num: int, dst_port: int, suid: str, anchor_cha
     """
     ensure_chain_and_anchor(anchor_chain=anchor_chain, table="filter", suid=suid, preserve=preserve, dry_run=dry_run)
     comment = _comment_for(suid, extra=f"udp_dport={dst_port};queue={queue_num}", preserve=preserve)
-    command = (
-        f"iptables -I {STORMSHADOW_CHAIN} -p udp --dport {dst_port} "
-        f"-j NFQUEUE --queue-num {queue_num} -m comment --comment '{comment}'"
-    )
+    command = [
+        "iptables", "-I", STORMSHADOW_CHAIN, "-p", "udp", "--dport", str(dst_port),
+        "-j", "NFQUEUE", "--queue-num", str(queue_num), "-m", "comment", "--comment", comment,
+    ]
     try:
         print_debug(f"Adding tagged NFQUEUE rule: {command}")
-        run_command_str(command, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
+        run_command(command, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
         return True
     except subprocess.CalledProcessError as e:
         print_warning(f"Failed to add tagged NFQUEUE rule: {e}")
         return False
 
 
+def _delete_rules(table: str, rules: List[str], dry_run: bool = False) -> int:
+    """
+    Delete rules given as iptables -S lines, with a single iptables-restore call.
+
+    The batch is applied atomically; if it fails (e.g. a rule vanished in the
+    meantime), the rules are deleted one by one instead.
+
+    Args:
+        table: The iptables table holding the rules.
+        rules: Rule specifications as printed by iptables -S ("-A CHAIN ...").
+        dry_run: If True, don't actually execute modification commands.
+
+    Returns:
+        The number of rules removed.
+    """
+    deletes = [rule.replace("-A", "-D", 1) for rule in rules]
+    if len(deletes) > 1:
+        script = f"*{table}\n" + "\n".join(deletes) + "\nCOMMIT\n"
+        try:
+            run_command(["iptables-restore", "--noflush"], input=script, capture_output=True,
+                        check=True, want_sudo=True, dry_run=dry_run)
+            for delete in deletes:
+                print_debug(f"Removed rule: iptables -t {table} {delete}")
+            return len(deletes)
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print_debug(f"Batched rule removal failed, removing rules one by one: {e}")
+
+    removed = 0
+    for delete in deletes:
+        try:
+            # Rules come back from iptables -S as text, with quoted comments
+            run_command(
+                ["iptables", "-t", table, *shlex.split(delete)],
+                capture_output=False, check=True, want_sudo=True, dry_run=dry_run
+            )
+            removed += 1
+            print_debug(f"Removed rule: iptables -t {table} {delete}")
+        except subprocess.CalledProcessError as e:
+            print_warning(f"Failed to remove rule: iptables -t {table} {delete} -> {e}")
+    return removed
+
+
 def remove_rules_for_suid(suid: str, table: str = "filter", chain: str = STORMSHADOW_CHAIN, dry_run: bool = False) -> int:
     """Remove all rules in given table/chain that have a Stormshadow comment with the given SUID. Returns removed count."""
-    removed = 0
     lines = _iptables_S(chain=chain, table=table)
-    # Delete using full spec: replace leading '-A' with '-D'
-    for line in lines:
-        if "-m comment --comment" in line and COMMENT_PREFIX in line and suid in line:
-            delete = line.replace("-A", "-D", 1)
-            try:
-                run_command_str(
-                    f"iptables -t {table} {delete}", capture_output=False, check=True, want_sudo=True, dry_run=dry_run
-                )
-                removed += 1
-                print_debug(f"Removed rule for SUID {suid}: iptables -t {table} {delete}")
-            except subprocess.CalledProcessError as e:
-                print_warning(f"Failed to remove rule: iptables -t {table} {delete} -> {e}")
-    return removed
+    rules = [line for line in lines
+             if "-m comment --comment" in line and COMMENT_PREFIX in line and suid in line]
+    return _delete_rules(table, rules, dry_run=dry_run)
 
 def remove_all_rules_for_suid(suid: str, dry_run: bool = False) -> int:
     """
@@ -362,30 +396,22 @@ def remove_all_rules_for_suid(suid: str, dry_run: bool = False) -> int:
     removed_total = 0
     
     # Remove anchor jumps in main chains (filter table)
+    anchor_rules: List[str] = []
     for anchor_chain in ["INPUT", "OUTPUT", "FORWARD"]:
         lines = _iptables_S(chain=anchor_chain, table="filter")
         for line in lines:
             if f"-j {STORMSHADOW_CHAIN}" in line and "-m comment --comment" in line and COMMENT_PREFIX in line and suid in line:
-                delete_rule = line.replace("-A", "-D", 1)
-                try:
-                    run_command_str(f"iptables -t filter {delete_rule}", capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
-                    removed_total += 1
-                    print_debug(f"Removed anchor jump for SUID {suid}: {delete_rule}")
-                except subprocess.CalledProcessError as e:
-                    print_warning(f"Failed to remove anchor jump: {e}")
+                anchor_rules.append(line)
+    removed_total += _delete_rules("filter", anchor_rules, dry_run=dry_run)
     
     # Remove anchor jumps in main chains (nat table)  
+    anchor_rules = []
     for anchor_chain in ["OUTPUT", "PREROUTING", "POSTROUTING"]:
         lines = _iptables_S(chain=anchor_chain, table="nat")
         for line in lines:
             if f"-j {STORMSHADOW_NAT_CHAIN}" in line and "-m comment --comment" in line and COMMENT_PREFIX in line and suid in line:
-                delete_rule = line.replace("-A", "-D", 1)
-                try:
-                    run_command_str(f"iptables -t nat {delete_rule}", capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
-                    removed_total += 1
-                    print_debug(f"Removed nat anchor jump for SUID {suid}: {delete_rule}")
-                except subprocess.CalledProcessError as e:
-                    print_warning(f"Failed to remove nat anchor jump: {e}")
+                anchor_rules.append(line)
+    removed_total += _delete_rules("nat", anchor_rules, dry_run=dry_run)
     
     # Remove rules in STORMSHADOW chains
     removed_total += remove_rules_for_suid(suid, table="filter", chain=STORMSHADOW_CHAIN, dry_run=dry_run)
@@ -492,7 +518,7 @@ def cleanup_stale_rules(ttl_seconds: int = DEFAULT_TTL_SECONDS, heartbeat_dir: s
                             # Remove this specific anchor jump
                             delete_rule = line.replace("-A", "-D", 1)
                             try:
-                                run_command_str(f"iptables -t filter {delete_rule}", capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
+                                run_command(["iptables", "-t", "filter", *shlex.split(delete_rule)], capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
                                 removed_total += 1
                                 print_debug(f"Removed stale anchor jump: {delete_rule}")
                             except subprocess.CalledProcessError as e:
@@ -529,7 +555,7 @@ def cleanup_stale_rules(ttl_seconds: int = DEFAULT_TTL_SECONDS, heartbeat_dir: s
 def has_ipset() -> bool:
     """Return True if ipset command is available. This is a read-only check, so dry_run is not used."""
     try:
-        run_command_str("ipset --version", capture_output=True, check=True, want_sudo=True)
+        run_command(["ipset", "--version"], discard_output=True, check=True, want_sudo=True)
         return True
     except Exception:
         return False
@@ -539,15 +565,15 @@ def ensure_ipset_set(name: str, set_type: str = "bitmap:port", timeout: int = DE
     """Create an ipset set if missing. bitmap:port with timeout provides auto-expiry for ports."""
     # Check if exists (read-only, no dry_run)
     try:
-        run_command_str(f"ipset list {name}", capture_output=False, check=True, want_sudo=True)
+        run_command(["ipset", "list", name], discard_output=True, check=True, want_sudo=True)
         return True  # exists
     except subprocess.CalledProcessError:
         pass
     
     # Create the set (modifies, uses dry_run)
     try:
-        run_command_str(
-            f"ipset create {name} {set_type} timeout {timeout}", 
+        run_command(
+            ["ipset", "create", name, set_type, "timeout", str(timeout)],
             capture_output=False, 
             check=True, 
             want_sudo=True,
@@ -563,8 +589,8 @@ def ensure_ipset_set(name: str, set_type: str = "bitmap:port", timeout: int = DE
 def ipset_add_port(name: str, port: int, timeout: int = DEFAULT_TTL_SECONDS, dry_run: bool = False) -> bool:
     """Add or refresh a port in the ipset with a timeout (auto-expires)."""
     try:
-        run_command_str(
-            f"ipset add {name} {port} timeout {timeout} -exist", 
+        run_command(
+            ["ipset", "add", name, str(port), "timeout", str(timeout), "-exist"],
             capture_output=False, 
             check=True, 
             want_sudo=True,
@@ -598,24 +624,21 @@ def ensure_nfqueue_rule_using_ipset(queue_num: int, suid: str, anchor_chain: str
         return None
     
     # Ensure the single NFQUEUE rule exists (check is read-only, no dry_run)
-    check_cmd = (
-        f"iptables -C {STORMSHADOW_CHAIN} -p udp -m set --match-set {set_name} dst "
-        f"-j NFQUEUE --queue-num {queue_num}"
-    )
+    rule = [
+        "-p", "udp", "-m", "set", "--match-set", set_name, "dst",
+        "-j", "NFQUEUE", "--queue-num", str(queue_num),
+    ]
     try:
-        run_command_str(check_cmd, capture_output=False, check=True, want_sudo=True)
+        run_command(["iptables", "-C", STORMSHADOW_CHAIN, *rule], discard_output=True, check=True, want_sudo=True)
         print_debug("ipset-backed NFQUEUE rule already present")
         return set_name
     except subprocess.CalledProcessError:
         pass
 
     comment = _comment_for(suid, extra=f"ipset={set_name};queue={queue_num}")
-    add_cmd = (
-        f"iptables -I {STORMSHADOW_CHAIN} -p udp -m set --match-set {set_name} dst "
-        f"-j NFQUEUE --queue-num {queue_num} -m comment --comment '{comment}'"
-    )
+    add_cmd = ["iptables", "-I", STORMSHADOW_CHAIN, *rule, "-m", "comment", "--comment", comment]
     try:
-        run_command_str(add_cmd, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
+        run_command(add_cmd, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
         print_debug("Inserted ipset-backed NFQUEUE rule")
         return set_name
     except subprocess.CalledProcessError as e:
@@ -625,7 +648,7 @@ def ensure_nfqueue_rule_using_ipset(queue_num: int, suid: str, anchor_chain: str
 
 def ipset_destroy(name: str, dry_run: bool = False) -> None:
     try:
-        run_command_str(f"ipset destroy {name}", capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
+        run_command(["ipset", "destroy", name], capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
     except subprocess.CalledProcessError:
         pass
 
@@ -648,21 +671,21 @@ def activate_return_path(
         suid: Session unique identifier
         dry_run: If True, don't actually execute modification commands
     """
-    source_port = ""
+    source_port: List[str] = []
     if src_port != 0:
-        source_port = f"--sport {src_port}"
+        source_port = ["--sport", str(src_port)]
     else:
         print_warning("No source port specified, all udp packets will be affected.")
     try:
         ensure_nat_chain_and_anchor(anchor_chain="OUTPUT", suid=suid or "anchor", preserve=False, dry_run=dry_run)
         comment = _comment_for(suid, extra=f"dnat_to={receiver_ip}:{receiver_port}") if suid else None
-        base = (
-            f"sudo iptables -t nat -I {STORMSHADOW_NAT_CHAIN} -p udp {source_port} -d {spoofed_subnet} "
-            f"-j DNAT --to-destination {receiver_ip}:{receiver_port}"
-        )
-        command = f"{base} -m comment --comment '{comment}'" if comment else base
+        base = [
+            "iptables", "-t", "nat", "-I", STORMSHADOW_NAT_CHAIN, "-p", "udp", *source_port,
+            "-d", spoofed_subnet, "-j", "DNAT", "--to-destination", f"{receiver_ip}:{receiver_port}",
+        ]
+        command = [*base, "-m", "comment", "--comment", comment] if comment else base
         print_debug(f"Activating return path with command: {command}")
-        run_command_str(command, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
+        run_command(command, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
     except subprocess.CalledProcessError as e:
         print_warning(f"Failed to activate return path: {e}")
     
@@ -688,26 +711,26 @@ def deactivate_return_path(
     Returns:
         bool: True if the rule was successfully removed, False otherwise.
     """
-    source_port = ""
+    source_port: List[str] = []
     if src_port != 0:
-        source_port = f"--sport {src_port}"
+        source_port = ["--sport", str(src_port)]
     else:
         print_warning("No source port specified, all udp packets will be affected.")
     try:
         # Try delete with our chain and with comment (if any)
-        base = (
-            f"sudo iptables -t nat -D {STORMSHADOW_NAT_CHAIN} -p udp {source_port} -d {spoofed_subnet} "
-            f"-j DNAT --to-destination {receiver_ip}:{receiver_port}"
-        )
+        base = [
+            "iptables", "-t", "nat", "-D", STORMSHADOW_NAT_CHAIN, "-p", "udp", *source_port,
+            "-d", spoofed_subnet, "-j", "DNAT", "--to-destination", f"{receiver_ip}:{receiver_port}",
+        ]
         if suid:
             comment = _comment_for(suid, extra=f"dnat_to={receiver_ip}:{receiver_port}")
-            cmd = f"{base} -m comment --comment '{comment}'"
+            cmd = [*base, "-m", "comment", "--comment", comment]
             print_debug(f"Deactivating return path (tagged) with command: {cmd}")
-            run_command_str(cmd, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
+            run_command(cmd, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
             return True
         # Fallback: try without comment in our chain
         print_debug(f"Deactivating return path (untagged) with command: {base}")
-        run_command_str(base, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
+        run_command(base, capture_output=False, check=True, want_sudo=True, dry_run=dry_run)
         return True
     except subprocess.CalledProcessError as e:
         print_warning(f"Failed to deactivate return path: {e}")